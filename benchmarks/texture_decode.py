@@ -0,0 +1,98 @@
+# texture decoding benchmark, run outside of Blender:
+# 	python benchmarks/texture_decode.py [--formats BC7_UNORM BC7_UNORM_mode6 ...] [--min-size 64] [--max-size 4096] [--repeat 3]
+# times the same decode_texture that the import uses (deswizzle + decode + assemble) on synthetic data
+# the data is random but seeded, so every run (and every machine) decodes exactly the same textures
+# reports megapixels per second (best of the repeats) and the peak memory numpy allocated along the way
+# (the swizzle maps are cached between runs, same as during an import, so they don't count towards either)
+
+import argparse
+import numpy
+import os
+import struct
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),".."))
+from monado_forge.texture_funcs import *
+
+# [case name, imgType, blueBC5, BC7 mode to force (None for any)]
+# BC7 gets one case per mode since they all go down different paths, plus one with everything mixed together like a real texture
+def build_cases():
+	cases = []
+	for imgType,(imgFormat,bitsPerPixel) in imageFormats.items():
+		cases.append([imgFormat,imgType,False,None])
+		if imgFormat == "BC5_UNORM":
+			cases.append([imgFormat+"_blue",imgType,True,None])
+		if imgFormat == "BC7_UNORM":
+			for mode in range(8):
+				cases.append([imgFormat+"_mode"+str(mode),imgType,False,mode])
+	return cases
+
+# a fake LBIM file: the (swizzled or not) top mip, then the footer the importer reads the size and type from
+lbimFooterStruct = struct.Struct("<9L4s")
+def build_payload(imgType,imgWidth,imgHeight,swizzled,bc7Mode,seed):
+	imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
+	blockCountX = virtImgWidth // blockSize
+	blockCountY = virtImgHeight // blockSize
+	if swizzled: # swizzled data is padded out to whole GOBs, so there can be more of it
+		blockCount = int(get_swizzle_map(blockCountX,blockCountY,blockBytes).max())+1
+	else:
+		blockCount = blockCountX*blockCountY
+	rng = numpy.random.default_rng(seed)
+	blocks = rng.integers(0,256,[blockCount,blockBytes],dtype=numpy.uint8)
+	if bc7Mode is not None: # the mode is the number of 0 bits before the first 1 bit
+		modeMask = (1 << (bc7Mode+1))-1
+		blocks[:,0] &= numpy.uint8(0xFF ^ modeMask)
+		blocks[:,0] |= numpy.uint8(1 << bc7Mode)
+	footer = lbimFooterStruct.pack(0,0,imgWidth,imgHeight,0,0,imgType,0,0,b"LBIM")
+	return blocks.tobytes()+footer
+
+def run_case(imgType,imgWidth,imgHeight,blueBC5,swizzled,rawData,repeat):
+	bestTime = None
+	peakMemory = 0
+	for r in range(repeat):
+		tracemalloc.start()
+		start = time.perf_counter()
+		pixels,warnings = decode_texture(imgType,imgWidth,imgHeight,rawData,blueBC5,swizzled=swizzled)
+		elapsed = time.perf_counter()-start
+		current,peak = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		del pixels
+		if bestTime is None or elapsed < bestTime:
+			bestTime = elapsed
+		peakMemory = max(peakMemory,peak)
+	return bestTime,peakMemory
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmarks the texture decoders on synthetic data.")
+	parser.add_argument("--formats",nargs="*",help="only run these cases (default: all of them)")
+	parser.add_argument("--min-size",type=int,default=64)
+	parser.add_argument("--max-size",type=int,default=4096)
+	parser.add_argument("--repeat",type=int,default=3,help="runs per case; the fastest one is reported")
+	parser.add_argument("--seed",type=int,default=0)
+	args = parser.parse_args()
+
+	cases = build_cases()
+	if args.formats:
+		unknown = set(args.formats)-set(c[0] for c in cases)
+		if unknown:
+			parser.error("unknown case(s) "+", ".join(sorted(unknown))+" (known: "+", ".join(c[0] for c in cases)+")")
+		cases = [c for c in cases if c[0] in args.formats]
+	sizes = []
+	size = args.min_size
+	while size <= args.max_size:
+		sizes.append(size)
+		size *= 2
+
+	print("case".ljust(20)+"size".rjust(11)+"swizzled".rjust(10)+"MPix/s".rjust(10)+"peak MB".rjust(10))
+	for caseName,imgType,blueBC5,bc7Mode in cases:
+		for size in sizes:
+			for swizzled in [True,False]:
+				rawData = build_payload(imgType,size,size,swizzled,bc7Mode,args.seed)
+				bestTime,peakMemory = run_case(imgType,size,size,blueBC5,swizzled,rawData,args.repeat)
+				megapixels = size*size/1000000
+				print(caseName.ljust(20)+(str(size)+"x"+str(size)).rjust(11)+str(swizzled).rjust(10)+("%.2f" % (megapixels/bestTime)).rjust(10)+("%.1f" % (peakMemory/(1024*1024))).rjust(10))
+
+if __name__ == "__main__":
+	main()
@@ -1,6 +1,9 @@
-import bpy
-
-from bpy.types import AddonPreferences
+# texture decoding worker processes (see texture_funcs) import this package outside of Blender, so they only get the bpy-free parts
+try:
+	import bpy
+	from bpy.types import AddonPreferences
+except ImportError:
+	bpy = None
 
 bl_info = {
 	"name": "Monado Forge",
@@ -13,6 +16,7 @@ bl_info = {
 
 packageList = (
 				"classes",
+				"texture_funcs",
 				"utils",
 				"main_ui",
 				"import_funcs",
@@ -23,7 +27,8 @@ packageList = (
 				"modify_ui",
 				)
 
-register, unregister = bpy.utils.register_submodule_factory(__package__, packageList)
+if bpy:
+	register, unregister = bpy.utils.register_submodule_factory(__package__, packageList)
 
 if __name__ == "__main__":
 	register()
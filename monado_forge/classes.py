@@ -1,3 +1,5 @@
+import numpy
+
 # because just packing/unpacking arrays gets old and error-prone
 
 class MonadoForgeBone:
@@ -348,7 +350,11 @@ class MonadoForgeFace:
 class MonadoForgeMeshShape:
 	def __init__(self):
 		self._vtIndex = 0
-		self._vertices = {} # indexes are not necessarily in order or sequential, so must be a dict (by index) rather than a plain list
+		# one row per affected vertex, in three matching arrays
+		# indexes are not necessarily in order or sequential, so they have to be stored alongside rather than implied
+		self._vertexIndexes = numpy.zeros(0,dtype=numpy.uint32)
+		self._positions = numpy.zeros((0,3),dtype=numpy.float32) # relative to the basis
+		self._normals = numpy.zeros((0,3))
 		self._name = ""
 	
 	def getVertexTableIndex(self):
@@ -356,14 +362,34 @@ class MonadoForgeMeshShape:
 	def setVertexTableIndex(self,i):
 		self._vtIndex = i
 	
+	def getVertexIndexes(self):
+		return self._vertexIndexes
+	def getPositions(self):
+		return self._positions
+	def getNormals(self):
+		return self._normals
+	def setVertexData(self,indexes,positions,normals):
+		if not (len(indexes) == len(positions) == len(normals)):
+			raise ValueError("indexes, positions, and normals must all be the same length ("+str(len(indexes))+", "+str(len(positions))+", "+str(len(normals))+")")
+		self._vertexIndexes = numpy.asarray(indexes).reshape(-1)
+		self._positions = numpy.asarray(positions).reshape(-1,3)
+		self._normals = numpy.asarray(normals).reshape(-1,3)
+	
+	# one at a time, as a dict of {vertex index : MonadoForgeVertex} (built on request, so changing it doesn't change the shape)
 	def getVertices(self):
-		return self._vertices
+		vertices = {}
+		for i,position,normal in zip(self._vertexIndexes.tolist(),self._positions.tolist(),self._normals.tolist()):
+			v = MonadoForgeVertex()
+			v.setPosition(position)
+			v.setNormal(normal)
+			vertices[i] = v
+		return vertices
 	def clearVertices(self):
-		self._vertices = {}
+		self.setVertexData([],[],[])
 	def addVertex(self,i,v):
-		self._vertices[i] = v
+		self.setVertexData(numpy.append(self._vertexIndexes,i),numpy.append(self._positions,[v.getPosition()],axis=0),numpy.append(self._normals,[v.getNormal()],axis=0))
 	def setVertices(self,a):
-		self._vertices = a
+		self.setVertexData(list(a.keys()),[v.getPosition() for v in a.values()],[v.getNormal() for v in a.values()])
 	
 	def getName(self):
 		return self._name
@@ -372,51 +398,317 @@ class MonadoForgeMeshShape:
 			raise TypeError("expected a string, not a(n) "+str(type(x)))
 		self._name = x
 
+# one vertex of a MonadoForgeMesh, for anything that's easier to do a vertex at a time
+# it doesn't hold anything itself, it just reads from and writes to the mesh's arrays (its ID is its row in them)
+class MonadoForgeMeshVertex:
+	__slots__ = ["_mesh","_id"]
+	def __init__(self,mesh,i):
+		self._mesh = mesh
+		self._id = i
+	
+	def getID(self):
+		return self._id
+	
+	def getPosition(self):
+		return self._mesh._positions[self._id]
+	def setPosition(self,a):
+		if len(a) != 3:
+			raise ValueError("sequence must be length 3, not "+str(len(a)))
+		self._mesh._positions[self._id] = a
+	
+	def hasUVs(self):
+		return self._mesh._uvs != {}
+	def getUVs(self):
+		return {layer:uvs[self._id] for layer,uvs in self._mesh._uvs.items()}
+	def getUV(self,layer):
+		return self._mesh._uvs[layer][self._id]
+	def setUV(self,layer,value):
+		if len(value) != 2:
+			raise ValueError("sequence must be length 2, not "+str(len(value)))
+		if layer not in self._mesh._uvs:
+			self._mesh.setVertexUVs(layer,numpy.zeros((self._mesh.getVertexCount(),2)))
+		self._mesh._uvs[layer][self._id] = value
+	
+	def hasNormal(self):
+		return self._mesh._normals is not None
+	def getNormal(self):
+		return None if self._mesh._normals is None else self._mesh._normals[self._id]
+	def setNormal(self,a):
+		if len(a) != 3:
+			raise ValueError("sequence must be length 3, not "+str(len(a)))
+		if self._mesh._normals is None:
+			self._mesh.setVertexNormals(numpy.zeros((self._mesh.getVertexCount(),3)))
+		self._mesh._normals[self._id] = a
+	
+	def hasColour(self):
+		return self._mesh._colours is not None
+	def getColour(self):
+		return None if self._mesh._colours is None else self._mesh._colours[self._id]
+	def setColour(self,a):
+		if len(a) != 4: # allow alpha colours
+			raise ValueError("sequence must be length 4, not "+str(len(a)))
+		if self._mesh._colours is None:
+			self._mesh.setVertexColours(numpy.zeros((self._mesh.getVertexCount(),4),dtype=numpy.uint8))
+		self._mesh._colours[self._id] = a
+	
+	def hasWeightIndex(self):
+		return self.getWeightSetIndex() != -1
+	def getWeightSetIndex(self):
+		return -1 if self._mesh._weightSetIndexes is None else int(self._mesh._weightSetIndexes[self._id])
+	def clearWeightSetIndex(self):
+		if self._mesh._weightSetIndexes is not None:
+			self._mesh._weightSetIndexes[self._id] = -1
+	def setWeightSetIndex(self,x):
+		if not isinstance(x,int):
+			raise TypeError("expected an int, not a(n) "+str(type(x)))
+		if self._mesh._weightSetIndexes is None:
+			self._mesh.setVertexWeightSetIndexes(numpy.full(self._mesh.getVertexCount(),-1,dtype=numpy.int64))
+		self._mesh._weightSetIndexes[self._id] = x
+	
+	def hasWeights(self):
+		return self.getWeights() != {}
+	def getWeights(self):
+		if self._mesh._weightGroups is None:
+			return {}
+		return {g:v for g,v in zip(self._mesh._weightGroups[self._id].tolist(),self._mesh._weightValues[self._id].tolist()) if g != -1}
+	def getWeight(self,groupIndex):
+		return self.getWeights()[groupIndex]
+	def clearWeights(self):
+		if self._mesh._weightGroups is not None:
+			self._mesh._weightGroups[self._id] = -1
+			self._mesh._weightValues[self._id] = 0.0
+	def setWeight(self,groupIndex,value):
+		if not isinstance(groupIndex,int):
+			raise TypeError("expected an int, not a(n) "+str(type(groupIndex)))
+		if not isinstance(value,float):
+			raise TypeError("expected a float, not a(n) "+str(type(value)))
+		self._mesh._setVertexWeight(self._id,groupIndex,value)
+
 class MonadoForgeMesh:
+	# per-vertex data is kept as arrays with a row per vertex (rather than as an object per vertex)
+	# attributes the mesh doesn't have are None (or not in the dict, for UVs)
+	# assumption: if a single vertex has any of these, all the other vertices must also
 	def __init__(self):
 		self._name = "Mesh"
-		self._vertices = []
-		self._faces = []
-		self._weightSets = [] # because it can be convenient to hold these here and have vertexes just refer with index
+		self._positions = numpy.zeros((0,3),dtype=numpy.float32)
+		self._normals = None
+		self._uvs = {} # {layer : array}
+		self._colours = None # RGBA
+		self._weightSetIndexes = None # pre-bake (-1 for none)
+		self._weightGroups = None # post-bake, a fixed number of [group index] slots per vertex (-1 for an unused slot)
+		self._weightValues = None # post-bake, the value of each slot
+		self._vertexBuffers = {} # spare room behind the arrays above, only for addVertex
+		self._faces = numpy.zeros((0,3),dtype=numpy.uint16) # one row of vertex indexes per triangle
+		self._weightSetGroups = numpy.zeros((0,4),dtype=numpy.int64) # because it can be convenient to hold these here and have vertexes just refer with index
+		self._weightSetValues = numpy.zeros((0,4))
 		self._shapes = [] # list of MonadoForgeMeshShapes
 		self._materialIndex = 0
 	
+	def getVertexCount(self):
+		return len(self._positions)
+	# views of each vertex (see MonadoForgeMeshVertex), made on request
 	def getVertices(self):
-		return self._vertices
+		return [MonadoForgeMeshVertex(self,i) for i in range(len(self._positions))]
 	def clearVertices(self):
-		self._vertices = []
+		self._positions = numpy.zeros((0,3),dtype=numpy.float32)
+		self._normals = None
+		self._uvs = {}
+		self._colours = None
+		self._weightSetIndexes = None
+		self._weightGroups = None
+		self._weightValues = None
+		self._vertexBuffers = {}
+	# adds a row to the end of every vertex array
+	# the arrays are views into buffers with room to spare (doubled when they fill up), so adding vertices one at a time doesn't copy everything every time
 	def addVertex(self,v):
-		if not isinstance(v,MonadoForgeVertex):
+		if not isinstance(v,(MonadoForgeVertex,MonadoForgeMeshVertex)):
 			raise TypeError("expected a MonadoForgeVertex, not a(n) "+str(type(v)))
-		self._vertices.append(v)
+		count = len(self._positions)
+		# read everything first, in case v is a view of this mesh and its row moves when the buffers grow
+		position = list(v.getPosition())
+		normal = list(v.getNormal()) if v.hasNormal() else None
+		colour = list(v.getColour()) if v.hasColour() else None
+		weightSetIndex = v.getWeightSetIndex()
+		uvs = {layer:list(uv) for layer,uv in v.getUVs().items()}
+		weights = v.getWeights()
+		# anything the new vertex has that the mesh doesn't yet gets zeros for the existing vertices (same as setVertices)
+		if normal is not None and self._normals is None:
+			self._normals = numpy.zeros((count,3))
+		if colour is not None and self._colours is None:
+			self._colours = numpy.zeros((count,4),dtype=numpy.uint8)
+		if weightSetIndex != -1 and self._weightSetIndexes is None:
+			self._weightSetIndexes = numpy.full(count,-1,dtype=numpy.int64)
+		for layer in uvs.keys():
+			if layer not in self._uvs:
+				self._uvs[layer] = numpy.zeros((count,2))
+		if weights and self._weightGroups is None:
+			self._weightGroups = numpy.full((count,4),-1,dtype=numpy.int64)
+			self._weightValues = numpy.zeros((count,4))
+		self._positions = self._appendVertexRow("positions",self._positions,position)
+		if self._normals is not None:
+			self._normals = self._appendVertexRow("normals",self._normals,[0.0,0.0,0.0] if normal is None else normal)
+		if self._colours is not None:
+			self._colours = self._appendVertexRow("colours",self._colours,[0,0,0,0] if colour is None else colour)
+		if self._weightSetIndexes is not None:
+			self._weightSetIndexes = self._appendVertexRow("weightSetIndexes",self._weightSetIndexes,weightSetIndex)
+		for layer in self._uvs.keys():
+			self._uvs[layer] = self._appendVertexRow(("uvs",layer),self._uvs[layer],uvs.get(layer,[0.0,0.0]))
+		if self._weightGroups is not None:
+			self._weightGroups = self._appendVertexRow("weightGroups",self._weightGroups,-1)
+			self._weightValues = self._appendVertexRow("weightValues",self._weightValues,0.0)
+			for groupIndex,value in weights.items():
+				self._setVertexWeight(count,groupIndex,value)
+	def _appendVertexRow(self,key,a,row):
+		buffer = self._vertexBuffers.get(key)
+		# only reuse the buffer if a is still the start of it (anything set since then has its own array)
+		if buffer is None or a.base is not buffer or len(buffer) <= len(a) or buffer.dtype != a.dtype or buffer.shape[1:] != a.shape[1:]:
+			buffer = numpy.empty((max(16,len(a)*2),)+a.shape[1:],dtype=a.dtype)
+			buffer[:len(a)] = a
+			self._vertexBuffers[key] = buffer
+		buffer[len(a)] = row
+		return buffer[:len(a)+1]
+	# either a list of vertices (MonadoForgeVertex or MonadoForgeMeshVertex), which get copied into arrays
+	# or another MonadoForgeMesh, whose vertex arrays get shared (not copied), for meshes that use the same vertex table
 	def setVertices(self,a):
-		self._vertices = []
-		for v in a: self.addVertex(v)
+		if isinstance(a,MonadoForgeMesh):
+			self._positions = a._positions
+			self._normals = a._normals
+			self._uvs = dict(a._uvs)
+			self._colours = a._colours
+			self._weightSetIndexes = a._weightSetIndexes
+			self._weightGroups = a._weightGroups
+			self._weightValues = a._weightValues
+			return
+		for v in a:
+			if not isinstance(v,(MonadoForgeVertex,MonadoForgeMeshVertex)):
+				raise TypeError("expected a MonadoForgeVertex, not a(n) "+str(type(v)))
+		positions = [list(v.getPosition()) for v in a]
+		normals = [list(v.getNormal()) if v.hasNormal() else [0.0,0.0,0.0] for v in a] if any(v.hasNormal() for v in a) else None
+		colours = [list(v.getColour()) if v.hasColour() else [0,0,0,0] for v in a] if any(v.hasColour() for v in a) else None
+		weightSetIndexes = [v.getWeightSetIndex() for v in a] if any(v.hasWeightIndex() for v in a) else None
+		vertexUVs = [v.getUVs() for v in a]
+		uvLayers = dict.fromkeys(layer for vUVs in vertexUVs for layer in vUVs.keys()) # in order of first appearance
+		uvs = {layer:[list(vUVs[layer]) if layer in vUVs else [0.0,0.0] for vUVs in vertexUVs] for layer in uvLayers}
+		weights = [v.getWeights() for v in a]
+		self.clearVertices()
+		self.setVertexPositions(positions)
+		self.setVertexNormals(normals)
+		for layer,layerUVs in uvs.items():
+			self.setVertexUVs(layer,layerUVs)
+		self.setVertexColours(colours)
+		if weightSetIndexes is not None:
+			self.setVertexWeightSetIndexes(numpy.array(weightSetIndexes,dtype=numpy.int64))
+		for i,w in enumerate(weights):
+			for groupIndex,value in w.items():
+				self._setVertexWeight(i,groupIndex,value)
+	
+	# setting the positions sets the vertex count, so it must be done first
+	# (anything already there of a different count gets cleared, since it wouldn't line up anymore)
+	def getVertexPositions(self):
+		return self._positions
+	def setVertexPositions(self,a):
+		a = numpy.asarray(a,dtype=numpy.float32).reshape(-1,3)
+		if len(a) != len(self._positions):
+			self.clearVertices()
+		self._positions = a
+	def _checkVertexCount(self,a):
+		if len(a) != len(self._positions):
+			raise ValueError("expected one row per vertex ("+str(len(self._positions))+"), not "+str(len(a)))
+	# the rest can all be set to None to clear them
+	def getVertexNormals(self):
+		return self._normals
+	def setVertexNormals(self,a):
+		if a is not None:
+			a = numpy.asarray(a).reshape(-1,3)
+			self._checkVertexCount(a)
+		self._normals = a
+	def getVertexUVs(self,layer):
+		return self._uvs[layer]
+	def setVertexUVs(self,layer,a):
+		if a is None:
+			self._uvs.pop(layer,None)
+			return
+		a = numpy.asarray(a).reshape(-1,2)
+		self._checkVertexCount(a)
+		self._uvs[layer] = a
+	def getVertexColours(self):
+		return self._colours
+	def setVertexColours(self,a):
+		if a is not None:
+			a = numpy.asarray(a).reshape(-1,4)
+			self._checkVertexCount(a)
+		self._colours = a
+	def getVertexWeightSetIndexes(self):
+		return self._weightSetIndexes
+	def setVertexWeightSetIndexes(self,a):
+		if a is not None:
+			a = numpy.asarray(a).reshape(-1)
+			self._checkVertexCount(a)
+		self._weightSetIndexes = a
+	# (N,slots) arrays of group indexes (-1 for unused) and their values
+	def getVertexWeightGroups(self):
+		return self._weightGroups
+	def getVertexWeightValues(self):
+		return self._weightValues
+	def setVertexWeights(self,groups,values):
+		if groups is None or values is None:
+			self._weightGroups = None
+			self._weightValues = None
+			return
+		groups = numpy.asarray(groups)
+		values = numpy.asarray(values)
+		if groups.shape != values.shape or groups.ndim != 2:
+			raise ValueError("weight groups and values must be matching (N,slots) arrays, not "+str(groups.shape)+" and "+str(values.shape))
+		self._checkVertexCount(groups)
+		self._weightGroups = groups
+		self._weightValues = values
+	def _setVertexWeight(self,i,groupIndex,value):
+		if self._weightGroups is None:
+			self.setVertexWeights(numpy.full((len(self._positions),4),-1,dtype=numpy.int64),numpy.zeros((len(self._positions),4)))
+		row = self._weightGroups[i]
+		slots = numpy.flatnonzero(row == groupIndex)
+		if len(slots) == 0:
+			slots = numpy.flatnonzero(row == -1)
+		if len(slots) == 0: # no room, so everything gets more
+			self._weightGroups = numpy.pad(self._weightGroups,[[0,0],[0,4]],constant_values=-1)
+			self._weightValues = numpy.pad(self._weightValues,[[0,0],[0,4]])
+			slots = [len(row)]
+		self._weightGroups[i,slots[0]] = groupIndex
+		self._weightValues[i,slots[0]] = value
 	
 	def getFaces(self):
 		return self._faces
 	def clearFaces(self):
-		self._faces = []
+		self._faces = numpy.zeros((0,3),dtype=numpy.uint16)
 	def addFace(self,f):
 		if not isinstance(f,MonadoForgeFace):
 			raise TypeError("expected a MonadoForgeFace, not a(n) "+str(type(f)))
-		self._faces.append(f)
+		self._faces = numpy.append(self._faces,[f.getVertexIndexes()],axis=0)
+	# either an (N,3) array of vertex indexes or a list of MonadoForgeFaces
 	def setFaces(self,a):
-		self._faces = []
-		for f in a: self.addFace(f)
-	
+		if isinstance(a,numpy.ndarray):
+			if a.ndim != 2 or a.shape[1] != 3:
+				raise ValueError("expected an (N,3) array, not "+str(a.shape))
+			self._faces = a
+		else:
+			self.clearFaces()
+			for f in a: self.addFace(f)
+	
+	# weight sets are a (K,slots) array of group indexes and a matching one of values
 	def getWeightSets(self):
-		return self._weightSets
+		return self._weightSetGroups,self._weightSetValues
 	def clearWeightSets(self):
-		self._weightSets = []
-	def addWeightSet(self,a):
-		if not isinstance(a,list):
-			raise TypeError("expected a list, not a(n) "+str(type(a)))
-		self._weightSets.append(a)
-	def setWeightSets(self,d):
-		if not isinstance(d,list):
-			raise TypeError("expected a list, not a(n) "+str(type(d)))
-		self._weightSets = d
+		self._weightSetGroups = numpy.zeros((0,4),dtype=numpy.int64)
+		self._weightSetValues = numpy.zeros((0,4))
+	def addWeightSet(self,groups,values):
+		self.setWeightSets(numpy.vstack([self._weightSetGroups,[groups]]),numpy.vstack([self._weightSetValues,[values]]))
+	def setWeightSets(self,groups,values):
+		groups = numpy.asarray(groups)
+		values = numpy.asarray(values)
+		if groups.shape != values.shape or groups.ndim != 2:
+			raise ValueError("weight set groups and values must be matching (K,slots) arrays, not "+str(groups.shape)+" and "+str(values.shape))
+		self._weightSetGroups = groups
+		self._weightSetValues = values
 	
 	def getShapes(self):
 		return self._shapes
@@ -437,57 +729,56 @@ class MonadoForgeMesh:
 			raise TypeError("expected an int, not a(n) "+str(type(i)))
 		self._materialIndex = i
 	
-	# assumption: if a single vertex has any of these, all the other vertices must also
 	def hasUVs(self):
-		for v in self._vertices:
-			if v.hasUVs(): return True
-		return False
+		return len(self._positions) > 0 and self._uvs != {}
 	def hasNormals(self):
-		for v in self._vertices:
-			if v.hasNormal(): return True
-		return False
+		return len(self._positions) > 0 and self._normals is not None
 	def hasColours(self):
-		for v in self._vertices:
-			if v.hasColour(): return True
-		return False
+		return len(self._positions) > 0 and self._colours is not None
 	def hasWeightIndexes(self):
-		for v in self._vertices:
-			if v.hasWeightIndex(): return True
-		return False
+		return self._weightSetIndexes is not None and bool((self._weightSetIndexes != -1).any())
 	def hasWeights(self):
-		for v in self._vertices:
-			if v.hasWeights(): return True
-		return False
+		return self._weightGroups is not None and bool((self._weightGroups != -1).any())
 	def hasShapes(self):
 		return len(self._shapes) > 0
 	
-	def indexVertices(self):
-		for i,v in enumerate(self._vertices):
-			v._id = i
+	def indexVertices(self): # vertex IDs are just their row, so there's nothing to do anymore
+		pass
 	
+	# lists (not arrays) of everything, for anything that wants those
 	def getVertexPositionsList(self):
-		return [v.getPosition() for v in self._vertices]
+		return self._positions.tolist()
 	def getUVLayerList(self):
-		layers = []
-		for v in self._vertices:
-			layers += [k for k in v.getUVs().keys()]
-		return list(set(layers))
+		return list(self._uvs.keys())
 	def getVertexUVsLayer(self,layer):
-		return [v.getUVs()[layer] for v in self._vertices]
+		return self._uvs[layer].tolist()
 	def getVertexNormalsList(self):
-		return [v.getNormal() for v in self._vertices]
+		return [None]*len(self._positions) if self._normals is None else self._normals.tolist()
 	def getVertexColoursList(self):
-		return [v.getColour() for v in self._vertices]
+		return [None]*len(self._positions) if self._colours is None else self._colours.tolist()
 	def getVertexWeightIndexesList(self):
-		return [v.getWeightSetIndex() for v in self._vertices]
+		return [-1]*len(self._positions) if self._weightSetIndexes is None else self._weightSetIndexes.tolist()
 	def getVertexWeightsList(self):
-		return [v.getWeights() for v in self._vertices]
+		return [v.getWeights() for v in self.getVertices()]
 	def getVertexesInWeightGroup(self,groupID):
-		return [v for v in self._vertices if groupID in v.getWeights().keys()]
+		if self._weightGroups is None:
+			return []
+		return [MonadoForgeMeshVertex(self,i) for i in numpy.flatnonzero((self._weightGroups == groupID).any(axis=1)).tolist()]
 	def getVertexesWithWeightIndex(self,index):
-		return [v for v in self._vertices if v.getWeightSetIndex() == index]
+		if self._weightSetIndexes is None:
+			return self.getVertices() if index == -1 else []
+		return [MonadoForgeMeshVertex(self,i) for i in numpy.flatnonzero(self._weightSetIndexes == index).tolist()]
+	def getVertexIDsByWeightIndex(self):
+		# inverted index of weight set index -> array of vertex IDs, built with one sort instead of one scan per index
+		if self._weightSetIndexes is None:
+			return {}
+		order = numpy.argsort(self._weightSetIndexes,kind="stable")
+		sortedIndexes = self._weightSetIndexes[order]
+		uniqueIndexes,starts = numpy.unique(sortedIndexes,return_index=True)
+		ends = numpy.append(starts[1:],len(sortedIndexes))
+		return {int(w):order[s:e] for w,s,e in zip(uniqueIndexes,starts,ends) if w != -1}
 	def getFaceVertexIndexesList(self):
-		return [f.getVertexIndexes() for f in self._faces]
+		return self._faces.tolist()
 
 class MonadoForgeMeshHeader:
 	# intended to be immutable, so all the setting is in the constructor
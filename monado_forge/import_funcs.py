@@ -2,6 +2,7 @@ import bpy
 import io
 import math
 import mathutils
+import numpy
 import os
 
 from . classes import *
@@ -505,7 +506,7 @@ def realise_results(forgeResults, mainName, self, context):
 		newMeshObject.name = f"{mainName}_mesh{m:03d}"
 		meshData = newMeshObject.data
 		meshData.name = "Mesh"
-		vertCount = len(mesh.getVertices())
+		vertCount = mesh.getVertexCount()
 		meshData.from_pydata(mesh.getVertexPositionsList(),[],mesh.getFaceVertexIndexesList())
 		for f in meshData.polygons:
 			f.use_smooth = True
@@ -525,28 +526,23 @@ def realise_results(forgeResults, mainName, self, context):
 			for i in range(len(coloursList)):
 				vertCols.data[i].color = coloursList[i]
 		if mesh.hasWeightIndexes() and baseArmature: # try the indexes method first (faster) (and also needs a baseArmature or it makes no sense)
-			weightIndexes = set(mesh.getVertexWeightIndexesList())
-			vertexesInEachGroup = {}
-			for i in range(len(baseArmature.data.bones)):
-				newMeshObject.vertex_groups.new(name=baseArmature.data.bones[i].name)
-				vertexesInEachGroup[i] = mesh.getVertexesInWeightGroup(i)
-			vertexesInEachSet = {}
-			for i in weightIndexes:
-				vertexesInEachSet[i] = mesh.getVertexesWithWeightIndex(i)
-			weightSets = mesh.getWeightSets()
-			for weightIndex in weightIndexes:
-				try:
-					weightSetData = weightSets[weightIndex]
-				except IndexError: # can happen if the weight table override is high - the warning has already been given above
+			bones = baseArmature.data.bones
+			vertexesInEachSet = mesh.getVertexIDsByWeightIndex()
+			weightSetGroups,weightSetValues = mesh.getWeightSets()
+			# gather vertices by (group, value) first, so each bucket only needs one add() call
+			vertexesInEachBucket = {}
+			for weightIndex,vertexIDs in vertexesInEachSet.items():
+				if weightIndex >= len(weightSetGroups): # can happen if the weight table override is high - the warning has already been given above
 					continue
-				for j in range(len(weightSetData[0])):
-					groupIndex = weightSetData[0][j]
-					groupValue = weightSetData[1][j]
-					if groupValue == 0: continue
-					vertexGroup = newMeshObject.vertex_groups[groupIndex]
-					vertexesToAdd = vertexesInEachSet[weightIndex]
-					vertexIDsToAdd = [v.getID() for v in vertexesToAdd]
-					newMeshObject.vertex_groups[groupIndex].add(vertexIDsToAdd,groupValue,"ADD")
+				for groupIndex,groupValue in zip(weightSetGroups[weightIndex].tolist(),weightSetValues[weightIndex].tolist()):
+					if groupValue == 0 or groupIndex >= len(bones): continue
+					vertexesInEachBucket.setdefault((groupIndex,groupValue),[]).append(vertexIDs)
+			# only make groups for bones that are actually used, in bone order
+			vertexGroups = {}
+			for groupIndex in sorted(set(g for g,v in vertexesInEachBucket.keys())):
+				vertexGroups[groupIndex] = newMeshObject.vertex_groups.new(name=bones[groupIndex].name)
+			for (groupIndex,groupValue),vertexIDLists in vertexesInEachBucket.items():
+				vertexGroups[groupIndex].add(numpy.concatenate(vertexIDLists).tolist(),groupValue,"ADD")
 		elif mesh.hasWeights(): # no indexes, but do have directly-applied weights
 			pass # not needed at the present time
 		if mesh.hasShapes():
@@ -556,8 +552,12 @@ def realise_results(forgeResults, mainName, self, context):
 			meshData.shape_keys.use_relative = True
 			for s in shapes:
 				newShape = newMeshObject.shape_key_add(name=s.getName(),from_mix=False)
-				for vertexIndex,vertex in s.getVertices().items():
-					newShape.data[vertexIndex].co += mathutils.Vector(vertex.getPosition())
+				shapeCos = numpy.empty(len(newShape.data)*3,dtype=numpy.float32)
+				newShape.data.foreach_get("co",shapeCos)
+				shapeCos = shapeCos.reshape(-1,3)
+				vertexIndexes = s.getVertexIndexes()
+				shapeCos[vertexIndexes] = shapeCos[vertexIndexes]+s.getPositions() # not +=, so if an index is somehow in there twice, the last one wins instead of both adding up
+				newShape.data.foreach_set("co",shapeCos.ravel())
 		if not context.scene.monado_forge_import.skipMaterialImport:
 			meshData.materials.append(newMatsByIndex[mesh.getMaterialIndex()])
 		
@@ -1,8 +1,9 @@
 import bpy
-import io
 import math
 import mathutils
+import numpy
 import os
+import struct
 import zlib
 
 from . classes import *
@@ -10,30 +11,64 @@ from . utils import *
 from . import_funcs import *
 from . modify_funcs import *
 
+# record layouts (all little endian), so each fixed-size header/table entry is one read and one unpack
+# fields are named after the variables they used to be read into; skipped unknowns are just padding
+# SAR1 (.arc/.chr) and the skeletons inside
+sar1HeaderLayout = RecordLayout("SAR1Header","<4s7L","magic fileSize version numFiles tocOffset dataOffset unknown1 unknown2")
+sar1TocEntryLayout = RecordLayout("SAR1TocEntry","<3L","offset size unknown") # followed by the filename
+bcHeaderLayout = RecordLayout("BCHeader","<4s4L","magic blockCount fileSize pointerCount dataOffset")
+skelHeaderLayout = RecordLayout("SKELHeader","<4s2L","magic unknown1 unknown2")
+skelTocItemLayout = RecordLayout("SKELTocItem","<4L","itemOffset itemUnknown1 itemCount itemUnknown2")
+skelBoneDataLayout = RecordLayout("SKELBoneData","<12f","px py pz pw rx ry rz rw sx sy sz sw")
+# DMXM (.wimdo)
+dmxmHeaderLayout = RecordLayout("DMXMHeader","<4s9L","magic version modelsOffset materialsOffset unknown1 vertexBufferOffset shadersOffset cachedTexturesTableOffset unknown2 uncachedTexturesTableOffset")
+dmxmModelsHeaderLayout = RecordLayout("DMXMModelsHeader","<L6f4L40xL40x2L","meshesUnknown1 boundingBoxStartX boundingBoxStartY boundingBoxStartZ boundingBoxEndX boundingBoxEndY boundingBoxEndZ meshDataOffset meshCount meshesUnknown2 bonesOffset lodsOffset shapeItemsOffset shapeNamesOffset")
+dmxmMeshGroupLayout = RecordLayout("DMXMMeshGroup","<3L7f","meshTableOffset meshTableCount meshUnknown1 boundingBoxStartX boundingBoxStartY boundingBoxStartZ boundingBoxEndX boundingBoxEndY boundingBoxEndZ boundingRadius")
+dmxmMeshHeaderLayout = RecordLayout("DMXMMeshHeader","<2L2H2xH14xH16x","meshID meshFlags meshVertTableIndex meshFaceTableIndex meshMaterialIndex meshLODValue")
+dmxmBonesHeaderLayout = RecordLayout("DMXMBonesHeader","<7L","boneCount boneCount2 boneHeaderOffset boneMatrixesOffset bonesUnknown1 bonesUnknown2 bonePairsOffset")
+dmxmBoneHeaderLayout = RecordLayout("DMXMBoneHeader","<4L","nameOffset boneUnknown1 boneType boneIndex")
+dmxmBoneMatrixLayout = RecordLayout("DMXMBoneMatrix","<16f","xx xy xz xw yx yy yz yw zx zy zz zw px py pz pw")
+dmxmShapeTableLayout = RecordLayout("DMXMShapeTable","<2L","tableOffset tableCount") # used for both the shape items and the shape names
+dmxmShapeHeaderLayout = RecordLayout("DMXMShapeHeader","<2L","shapeNameOffset1 shapeNameOffset2")
+dmxmMaterialsHeaderLayout = RecordLayout("DMXMMaterialsHeader","<6L","materialHeadersOffset materialCount materialUnknown1 materialUnknown2 materialExtraDataOffset materialExtraDataCount")
+dmxmSamplerTableLayout = RecordLayout("DMXMSamplerTable","<2L","samplerCount samplerOffset")
+dmxmSamplerLayout = RecordLayout("DMXMSampler","<Lf","flags lodBias")
+dmxmMaterialLayout = RecordLayout("DMXMMaterial","<3L5f9L12L","matNameOffset matFlags1 matFlags2 matBaseColourR matBaseColourG matBaseColourB matBaseColourA matU0 matTextureTableOffset matTextureCount matU1 matU2 matU3 matU4 matU5 matU6 matExtraDataIndex matU7 matU8 matU9 matU10 matU11 matU12 matU13 matU14 matU15 matU16 matU17 matU18")
+dmxmTextureTableEntryLayout = RecordLayout("DMXMTextureTableEntry","<4H","textureIndex samplerIndex unknown1 unknown2")
+# DRSM (.wismt) and the things inside its subfiles
+drsmHeaderLayout = RecordLayout("DRSMHeader","<4s9L28x3L","magic version headerSize mainOffset tag revision contentPointersCount contentPointersOffset subfileCount subfileHeadersOffset textureIDsCount textureIDsOffset textureCountOffset")
+drsmContentPointerLayout = RecordLayout("DRSMContentPointer","<2L2H8x","internalOffset contentSize highResSubfileIndex contentType")
+drsmTextureTableHeaderLayout = RecordLayout("DRSMTextureTableHeader","<4L","textureCount textureChunkSize textureUnknown textureStringsOffset")
+drsmTextureHeaderLayout = RecordLayout("DRSMTextureHeader","<4L","textureUnknown1 textureFilesize textureOffset textureNameOffset")
+drsmSubfileHeaderLayout = RecordLayout("DRSMSubfileHeader","<3L","compressedSize uncompressedSize dataOffset")
+xbc1HeaderLayout = RecordLayout("XBC1Header","<4s4L28s","magic subfileVersion subfileSize subfileCompressedSize subfileUnknown1 subfileName")
+lbimFooterLayout = RecordLayout("LBIMFooter","<9L4s","subfileUnknown5 subfileUnknown4 imgWidth imgHeight subfileUnknown3 subfileUnknown2 imgType subfileUnknown1 imgVersion magic") # the last 0x28 bytes of a texture
+modelHeaderLayout = RecordLayout("ModelHeader","<4L24x5L","vertexTableOffset vertexTableCount faceTableOffset faceTableCount shapeDataOffset dataSize dataOffset weightDataSize weightDataOffset")
+vertexTableLayout = RecordLayout("VertexTable","<5L12x","vtDataOffset vtDataCount vtBlockSize vtDescOffset vtDescCount")
+vertexDescriptorLayout = RecordLayout("VertexDescriptor","<2H","vdType vdSize")
+faceTableLayout = RecordLayout("FaceTable","<2L12x","ftDataOffset ftVertCount")
+weightDataHeaderLayout = RecordLayout("WeightDataHeader","<2LH","weightTableCount weightTableOffset weightVertTableIndex")
+weightTableLayout = RecordLayout("WeightTable","<4x2L17xB10x","wtDataOffset wtDataCount wtLOD")
+shapeDataHeaderLayout = RecordLayout("ShapeDataHeader","<4L","shapeHeaderCount shapeHeaderOffset shapeTargetCount shapeTargetOffset")
+shapeHeaderLayout = RecordLayout("ShapeHeader","<5L","shapeDataChunkID shapeTargetIndex shapeTargetCounts shapeTargetIDOffset dummy")
+shapeTargetLayout = RecordLayout("ShapeTarget","<3L2H","targetDataChunkOffset targetVertexCount targetBlockSize targetUnknown targetType")
+
 def import_sar1_skel_subfile(f, context):
 	game = context.scene.monado_forge_main.game
 	printProgress = context.scene.monado_forge_main.printProgress
 	importEndpoints = context.scene.monado_forge_import.importEndpoints
 	
-	magic = f.read(4)
-	if magic != b"1RAS":
+	header = sar1HeaderLayout.read(f)
+	if header.magic != b"1RAS":
 		print_error(f.name+" is not a valid SAR1 file (unexpected header)")
 		return None
-	fileSize = readAndParseInt(f,4)
-	version = readAndParseInt(f,4)
-	numFiles = readAndParseInt(f,4)
-	tocOffset = readAndParseInt(f,4)
-	dataOffset = readAndParseInt(f,4)
-	unknown1 = readAndParseInt(f,4)
-	unknown2 = readAndParseInt(f,4)
 	path = readStr(f)
 	
 	importedSkeletons = []
-	for i in range(numFiles):
-		f.seek(tocOffset+i*0x40)
-		offset = readAndParseInt(f,4)
-		size = readAndParseInt(f,4)
-		unknown = readAndParseInt(f,4)
+	for i in range(header.numFiles):
+		f.seek(header.tocOffset+i*0x40)
+		tocEntry = sar1TocEntryLayout.read(f)
+		offset = tocEntry.offset
 		filename = readStr(f)
 		# todo: try to do this based on file type instead of name
 		if game == "XC3":
@@ -44,32 +79,23 @@ def import_sar1_skel_subfile(f, context):
 			continue
 		
 		f.seek(offset)
-		bcMagic = f.read(4)
-		if bcMagic == b"LCHC": # some sort of special case I guess? (seen in XBC2ModelDecomp)
+		if f.read(4) == b"LCHC": # some sort of special case I guess? (seen in XBC2ModelDecomp)
 			continue
-		if bcMagic != b"BC\x00\x00": # BC check
+		f.seek(offset)
+		bcHeader = bcHeaderLayout.read(f)
+		if bcHeader.magic != b"BC\x00\x00": # BC check
 			print_error("BC check failed for "+filename+" (dunno what this means tbh, file probably bad in some way e.g. wrong endianness)")
 			continue
-		blockCount = readAndParseInt(f,4)
-		fileSize = readAndParseInt(f,4)
-		pointerCount = readAndParseInt(f,4)
-		dataOffset = readAndParseInt(f,4)
 		
-		f.seek(offset+dataOffset+4)
-		skelMagic = f.read(4)
-		if skelMagic != b"SKEL":
+		f.seek(offset+bcHeader.dataOffset+4)
+		skelHeader = skelHeaderLayout.read(f)
+		if skelHeader.magic != b"SKEL":
 			print_error(".skl file "+filename+" has bad header")
 			return None
 		
-		skelHeaderUnknown1 = readAndParseInt(f,4)
-		skelHeaderUnknown2 = readAndParseInt(f,4)
 		skelTocItems = []
 		for j in range(10): # yeah it's a magic number, deal with it
-			itemOffset = readAndParseInt(f,4)
-			itemUnknown1 = readAndParseInt(f,4)
-			itemCount = readAndParseInt(f,4)
-			itemUnknown2 = readAndParseInt(f,4)
-			skelTocItems.append([itemOffset,itemUnknown1,itemCount,itemUnknown2])
+			skelTocItems.append(skelTocItemLayout.read(f))
 		
 		# finally we have the datums
 		# TOC layout:
@@ -106,19 +132,8 @@ def import_sar1_skel_subfile(f, context):
 			f.seek(offset+nameOffset)
 			name = readStr(f)
 			# data
-			f.seek(offset+skelTocItems[4][0]+b*(4*12))
-			px = readAndParseFloat(f)
-			py = readAndParseFloat(f)
-			pz = readAndParseFloat(f)
-			pw = readAndParseFloat(f)
-			rx = readAndParseFloat(f)
-			ry = readAndParseFloat(f)
-			rz = readAndParseFloat(f)
-			rw = readAndParseFloat(f)
-			sx = readAndParseFloat(f)
-			sy = readAndParseFloat(f)
-			sz = readAndParseFloat(f)
-			sw = readAndParseFloat(f)
+			f.seek(offset+skelTocItems[4][0]+b*skelBoneDataLayout.size)
+			px,py,pz,pw,rx,ry,rz,rw,sx,sy,sz,sw = skelBoneDataLayout.read(f)
 			# reminder that the pos and scale are x,y,z,w but the rotation is w,x,y,z
 			fb = MonadoForgeBone()
 			fb.setParent(parent)
@@ -139,19 +154,8 @@ def import_sar1_skel_subfile(f, context):
 				f.seek(offset+nameOffset)
 				name = readStr(f)
 				# data
-				f.seek(offset+skelTocItems[8][0]+ep*(4*12))
-				px = readAndParseFloat(f)
-				py = readAndParseFloat(f)
-				pz = readAndParseFloat(f)
-				pw = readAndParseFloat(f)
-				rx = readAndParseFloat(f)
-				ry = readAndParseFloat(f)
-				rz = readAndParseFloat(f)
-				rw = readAndParseFloat(f)
-				sx = readAndParseFloat(f)
-				sy = readAndParseFloat(f)
-				sz = readAndParseFloat(f)
-				sw = readAndParseFloat(f)
+				f.seek(offset+skelTocItems[8][0]+ep*skelBoneDataLayout.size)
+				px,py,pz,pw,rx,ry,rz,rw,sx,sy,sz,sw = skelBoneDataLayout.read(f)
 				# for some reason, endpoints tend to have pw = 0, which positions it relative to root instead of parent (and we don't want that)
 				if pw == 0.0: pw = 1.0
 				# reminder that the pos and scale are x,y,z,w but the rotation is w,x,y,z
@@ -180,18 +184,11 @@ def import_sar1_skel_subfile(f, context):
 def import_wimdo(f, context, externalSkeleton=None):
 	printProgress = context.scene.monado_forge_main.printProgress
 	# little endian assumed
-	magic = f.read(4)
-	if magic != b"DMXM":
+	header = dmxmHeaderLayout.read(f)
+	if header.magic != b"DMXM":
 		raise ValueError("Not a valid .wimdo file (unexpected header)")
-	version = readAndParseInt(f,4)
-	modelsOffset = readAndParseInt(f,4)
-	materialsOffset = readAndParseInt(f,4)
-	unknown1 = readAndParseInt(f,4)
-	vertexBufferOffset = readAndParseInt(f,4)
-	shadersOffset = readAndParseInt(f,4)
-	cachedTexturesTableOffset = readAndParseInt(f,4)
-	unknown2 = readAndParseInt(f,4)
-	uncachedTexturesTableOffset = readAndParseInt(f,4)
+	modelsOffset = header.modelsOffset
+	materialsOffset = header.materialsOffset
 	
 	# assumption: there can be only one skeleton per .wimdo
 	forgeBones = []
@@ -202,66 +199,38 @@ def import_wimdo(f, context, externalSkeleton=None):
 	
 	if modelsOffset > 0:
 		f.seek(modelsOffset)
-		meshesUnknown1 = readAndParseInt(f,4)
-		boundingBoxStart = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-		boundingBoxEnd = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-		meshDataOffset = readAndParseInt(f,4)
-		meshCount = readAndParseInt(f,4)
-		meshesUnknown2 = readAndParseInt(f,4)
-		bonesOffset = readAndParseInt(f,4)
-		f.seek(f.tell()+21*4) # skip these unknowns
-		shapeItemsOffset = readAndParseInt(f,4)
-		shapeNamesOffset = readAndParseInt(f,4)
-		f.seek(modelsOffset+21*4) # skip s'more
-		lodsOffset = readAndParseInt(f,4)
+		modelsHeader = dmxmModelsHeaderLayout.read(f)
+		meshCount = modelsHeader.meshCount
+		bonesOffset = modelsHeader.bonesOffset
+		shapeItemsOffset = modelsHeader.shapeItemsOffset
+		shapeNamesOffset = modelsHeader.shapeNamesOffset
 		
 		if meshCount > 0:
-			f.seek(modelsOffset+meshDataOffset)
+			f.seek(modelsOffset+modelsHeader.meshDataOffset)
 			for i in range(meshCount):
-				meshTableOffset = readAndParseInt(f,4)
-				meshTableCount = readAndParseInt(f,4)
-				meshUnknown1 = readAndParseInt(f,4)
-				meshBoundingBoxStart = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-				meshBoundingBoxEnd = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-				meshBoundingRadius = readAndParseFloat(f)
-				f.seek(modelsOffset+meshTableOffset)
-				for j in range(meshTableCount):
-					meshID = readAndParseInt(f,4)
-					meshFlags = readAndParseInt(f,4)
-					meshVertTableIndex = readAndParseInt(f,2)
-					meshFaceTableIndex = readAndParseInt(f,2)
-					f.seek(f.tell()+2) # skip unknown
-					meshMaterialIndex = readAndParseInt(f,2)
-					f.seek(f.tell()+14) # skip unknown
-					meshLODValue = readAndParseInt(f,2)
-					f.seek(f.tell()+16) # skip unknown
-					meshHeaders.append(MonadoForgeMeshHeader(meshID,meshFlags,meshVertTableIndex,meshFaceTableIndex,meshMaterialIndex,meshLODValue))
+				meshGroup = dmxmMeshGroupLayout.read(f)
+				f.seek(modelsOffset+meshGroup.meshTableOffset)
+				for j in range(meshGroup.meshTableCount):
+					meshHeader = dmxmMeshHeaderLayout.read(f)
+					meshHeaders.append(MonadoForgeMeshHeader(*meshHeader))
 			if printProgress:
 				print("Found "+str(len(meshHeaders))+" mesh headers.")
 		
 		if bonesOffset > 0:
 			f.seek(modelsOffset+bonesOffset)
-			boneCount = readAndParseInt(f,4)
-			boneCount2 = readAndParseInt(f,4)
-			boneHeaderOffset = readAndParseInt(f,4)
-			boneMatrixesOffset = readAndParseInt(f,4)
-			bonesUnknown1 = readAndParseInt(f,4)
-			bonesUnknown2 = readAndParseInt(f,4) # claimed by XBC2MD to be "positions offset", but that's part of the matrixes
-			bonePairsOffset = readAndParseInt(f,4)
+			bonesHeader = dmxmBonesHeaderLayout.read(f) # bonesUnknown2 is claimed by XBC2MD to be "positions offset", but that's part of the matrixes
 			
-			for b in range(boneCount):
-				f.seek(modelsOffset+bonesOffset+boneHeaderOffset+b*6*4)
-				nameOffset = readAndParseInt(f,4)
-				boneUnknown1 = readAndParseInt(f,4)
-				boneType = readAndParseInt(f,4)
-				boneIndex = readAndParseInt(f,4)
-				f.seek(modelsOffset+bonesOffset+nameOffset)
+			for b in range(bonesHeader.boneCount):
+				f.seek(modelsOffset+bonesOffset+bonesHeader.boneHeaderOffset+b*6*4)
+				boneHeader = dmxmBoneHeaderLayout.read(f)
+				f.seek(modelsOffset+bonesOffset+boneHeader.nameOffset)
 				boneName = readStr(f)
-				f.seek(modelsOffset+bonesOffset+boneMatrixesOffset+b*16*4)
-				boneXAxis = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-				boneYAxis = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-				boneZAxis = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-				bonePosition = [-readAndParseFloat(f),-readAndParseFloat(f),-readAndParseFloat(f),-readAndParseFloat(f)] # yes, the negatives are needed
+				f.seek(modelsOffset+bonesOffset+bonesHeader.boneMatrixesOffset+b*dmxmBoneMatrixLayout.size)
+				boneMatrix = dmxmBoneMatrixLayout.read(f)
+				boneXAxis = list(boneMatrix[0:4])
+				boneYAxis = list(boneMatrix[4:8])
+				boneZAxis = list(boneMatrix[8:12])
+				bonePosition = [-v for v in boneMatrix[12:16]] # yes, the negatives are needed
 				# the position needs to be modified by the matrix in order to place it as expected
 				posMatrix = mathutils.Matrix.Translation(bonePosition)
 				rotMatrix = mathutils.Matrix([boneXAxis,boneYAxis,boneZAxis,bonePosition])
@@ -276,17 +245,15 @@ def import_wimdo(f, context, externalSkeleton=None):
 		
 		if shapeItemsOffset > 0:
 			f.seek(modelsOffset+shapeItemsOffset)
-			shapeHeaderOffset = readAndParseInt(f,4)
-			shapeHeaderCount = readAndParseInt(f,4)
-			for i in range(shapeHeaderCount):
-				f.seek(modelsOffset+shapeItemsOffset+shapeHeaderOffset+i*7*4)
-				shapeNameOffset1 = readAndParseInt(f,4)
-				shapeNameOffset2 = readAndParseInt(f,4)
+			shapeItems = dmxmShapeTableLayout.read(f)
+			for i in range(shapeItems.tableCount):
+				f.seek(modelsOffset+shapeItemsOffset+shapeItems.tableOffset+i*7*4)
+				shapeHeader = dmxmShapeHeaderLayout.read(f)
 				# it's unclear what the difference in these is supposed to be (the resulting strings seem to always be the same)
 				# there's a bunch of other stuff here but it doesn't seem like we need it?
-				f.seek(modelsOffset+shapeItemsOffset+shapeNameOffset1)
+				f.seek(modelsOffset+shapeItemsOffset+shapeHeader.shapeNameOffset1)
 				shapeName1 = readStr(f)
-				f.seek(modelsOffset+shapeItemsOffset+shapeNameOffset2)
+				f.seek(modelsOffset+shapeItemsOffset+shapeHeader.shapeNameOffset2)
 				shapeName2 = readStr(f)
 				shapeHeaders.append([shapeName1])
 			if printProgress:
@@ -294,68 +261,38 @@ def import_wimdo(f, context, externalSkeleton=None):
 		# apparently you can have shapes with controllers without names? odd
 		if shapeNamesOffset > 0:
 			f.seek(modelsOffset+shapeNamesOffset)
-			shapeNameTableOffset = readAndParseInt(f,4)
-			shapeNameTableCount = readAndParseInt(f,4)
-			for i in range(shapeNameTableCount):
-				f.seek(modelsOffset+shapeNamesOffset+shapeNameTableOffset+i*4*4)
+			shapeNameTable = dmxmShapeTableLayout.read(f)
+			for i in range(shapeNameTable.tableCount):
+				f.seek(modelsOffset+shapeNamesOffset+shapeNameTable.tableOffset+i*4*4)
 				shapeNameOffset = readAndParseInt(f,4)
 				f.seek(modelsOffset+shapeNamesOffset+shapeNameOffset)
 				shapeNames.append(readStr(f))
 	
 	if materialsOffset > 0 and not context.scene.monado_forge_import.skipMaterialImport:
 		f.seek(materialsOffset)
-		materialHeadersOffset = readAndParseInt(f,4)
-		materialCount = readAndParseInt(f,4)
-		materialUnknown1 = readAndParseInt(f,4)
-		materialUnknown2 = readAndParseInt(f,4)
-		materialExtraDataOffset = readAndParseInt(f,4)
-		materialExtraDataCount = readAndParseInt(f,4)
+		materialsHeader = dmxmMaterialsHeaderLayout.read(f)
 		# a bunch of unknowns follow (looks likely to be offset+count pairs), skipping entirely for the moment
 		f.seek(materialsOffset+92) # a magic number unfortunately
 		samplerTableOffset = readAndParseInt(f,4)
 		# get the samplers now so we can put them in the materials
 		f.seek(materialsOffset+samplerTableOffset)
-		samplerCount = readAndParseInt(f,4)
-		samplerOffset = readAndParseInt(f,4)
-		f.seek(materialsOffset+samplerTableOffset+samplerOffset)
+		samplerTable = dmxmSamplerTableLayout.read(f)
+		f.seek(materialsOffset+samplerTableOffset+samplerTable.samplerOffset)
 		samplers = []
-		for s in range(samplerCount):
-			samplers.append([readAndParseInt(f,4),readAndParseFloat(f)]) # flags, LOD bias (don't need to parse/understand here)
-		f.seek(materialsOffset+materialHeadersOffset)
-		for m in range(materialCount):
-			matNameOffset = readAndParseInt(f,4)
-			matFlags1 = readAndParseInt(f,4)
-			matFlags2 = readAndParseInt(f,4)
-			matBaseColour = [readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f),readAndParseFloat(f)]
-			matU0 = readAndParseFloat(f)
-			matTextureTableOffset = readAndParseInt(f,4)
-			matTextureCount = readAndParseInt(f,4)
-			matU1 = readAndParseInt(f,4) # some sort of flags, probably
-			matU2 = readAndParseInt(f,4)
-			matU3 = readAndParseInt(f,4)
-			matU4 = readAndParseInt(f,4)
-			matU5 = readAndParseInt(f,4)
-			matU6 = readAndParseInt(f,4)
-			matExtraDataIndex = readAndParseInt(f,4)
-			matU7 = readAndParseInt(f,4)
-			matU8 = readAndParseInt(f,4)
-			matU9 = readAndParseInt(f,4) # this is an offset
-			matU10 = readAndParseInt(f,4)
-			matU11 = readAndParseInt(f,4)
-			matU12 = readAndParseInt(f,4)
-			matU13 = readAndParseInt(f,4)
-			matU14 = readAndParseInt(f,4)
-			matU15 = readAndParseInt(f,4)
-			matU16 = readAndParseInt(f,4)
-			matU17 = readAndParseInt(f,4)
-			matU18 = readAndParseInt(f,4)
+		for s in range(samplerTable.samplerCount):
+			samplers.append(list(dmxmSamplerLayout.read(f))) # flags, LOD bias (don't need to parse/understand here)
+		f.seek(materialsOffset+materialsHeader.materialHeadersOffset)
+		for m in range(materialsHeader.materialCount):
+			matHeader = dmxmMaterialLayout.read(f) # matU1 is some sort of flags, probably, and matU9 is an offset
+			matBaseColour = [matHeader.matBaseColourR,matHeader.matBaseColourG,matHeader.matBaseColourB,matHeader.matBaseColourA]
+			matExtraDataIndex = matHeader.matExtraDataIndex
 			ftemp = f.tell()
-			f.seek(materialsOffset+matNameOffset)
+			f.seek(materialsOffset+matHeader.matNameOffset)
 			matName = readStr(f)
-			f.seek(materialsOffset+matTextureTableOffset)
+			f.seek(materialsOffset+matHeader.matTextureTableOffset)
 			matTextureTable = []
-			for t in range(matTextureCount):
-				matTextureTable.append([readAndParseInt(f,2),readAndParseInt(f,2),readAndParseInt(f,2),readAndParseInt(f,2)])
+			for t in range(matHeader.matTextureCount):
+				matTextureTable.append(list(dmxmTextureTableEntryLayout.read(f)))
 			f.seek(ftemp)
 			#materials.append([matName,matBaseColour,matTextureTable,matExtraDataIndex])
 			mat = MonadoForgeWimdoMaterial(m)
@@ -365,10 +302,9 @@ def import_wimdo(f, context, externalSkeleton=None):
 			mat.setSamplers(samplers) # yes this means each material has the samplers duplicated, but that's not really a big deal (it's two numbers)
 			mat.setExtraDataIndex(matExtraDataIndex)
 			materials.append(mat)
-		f.seek(materialsOffset+materialExtraDataOffset)
-		materialExtraData = []
-		for mx in range(materialExtraDataCount):
-			materialExtraData.append(readAndParseFloat(f))
+		f.seek(materialsOffset+materialsHeader.materialExtraDataOffset)
+		materialExtraDataCount = materialsHeader.materialExtraDataCount
+		materialExtraData = list(struct.unpack("<"+str(materialExtraDataCount)+"f",f.read(materialExtraDataCount*4)))
 		splitExtraData = []
 		matCounter = -1
 		nextStart = materials[0].getExtraDataIndex()
@@ -386,14 +322,14 @@ def import_wimdo(f, context, externalSkeleton=None):
 			print("Found "+str(len(materials))+" materials.")
 			#for m in materials:
 			#	print(m.getName(),m.getBaseColour(),m.getTextureTable(),m.getExtraDataIndex(),m.getExtraData())
-	if vertexBufferOffset > 0:
-		f.seek(vertexBufferOffset)
-	if shadersOffset > 0:
-		f.seek(shadersOffset)
-	if cachedTexturesTableOffset > 0:
-		f.seek(cachedTexturesTableOffset)
-	if uncachedTexturesTableOffset > 0: # don't need this for the texture files themselves - it's for metadata (alpha, repeat, etc)
-		f.seek(uncachedTexturesTableOffset)
+	if header.vertexBufferOffset > 0:
+		f.seek(header.vertexBufferOffset)
+	if header.shadersOffset > 0:
+		f.seek(header.shadersOffset)
+	if header.cachedTexturesTableOffset > 0:
+		f.seek(header.cachedTexturesTableOffset)
+	if header.uncachedTexturesTableOffset > 0: # don't need this for the texture files themselves - it's for metadata (alpha, repeat, etc)
+		f.seek(header.uncachedTexturesTableOffset)
 	
 	skeleton = MonadoForgeSkeleton()
 	skeleton.setBones(forgeBones)
@@ -402,27 +338,159 @@ def import_wimdo(f, context, externalSkeleton=None):
 		print("Finished parsing .wimdo file.")
 	return results
 
-def extract_wismt_subfile(f, headerOffset, headless=False):
+inflateChunkSize = 1024*1024 # how much compressed data gets read, and how much inflated data gets made, in one go
+
+# reads just a subfile's xbc1 header, so how big it's going to be is known before anything gets inflated
+# gives back [name, inflated size, compressed data], where the data is a view if f is mapped
+# otherwise it's [filepath, offset, size] for the inflating thread to read itself (other threads can't share f's position), or the data itself if f has no path
+def locate_wismt_subfile(f, headerOffset, headless=False):
 	f.seek(headerOffset)
-	compressedSize = readAndParseInt(f,4)
-	uncompressedSize = readAndParseInt(f,4)
-	dataOffset = readAndParseInt(f,4)
-	f.seek(dataOffset)
-	if headless:
-		f.seek(headerOffset)
-	submagic = f.read(4)
-	if submagic != b"xbc1":
+	if not headless:
+		f.seek(drsmSubfileHeaderLayout.read(f).dataOffset)
+	subfileHeader = xbc1HeaderLayout.read(f)
+	if subfileHeader.magic != b"xbc1":
 		raise ValueError("subfile at "+str(headerOffset)+" has an invalid header (not \"xbc1\")")
-	subfileVersion = readAndParseInt(f,4)
-	subfileSize = readAndParseInt(f,4)
-	subfileCompressedSize = readAndParseInt(f,4)
-	subfileUnknown1 = readAndParseInt(f,4)
-	subfileName = readFixedLenStr(f,28)
-	content = zlib.decompress(f.read(subfileCompressedSize))
-	if len(content) != subfileSize:
-		raise ValueError("subfile "+subfileName+" did not decompress to its claimed size: "+str(len(content))+" != "+str(subfileSize))
+	subfileName = subfileHeader.subfileName.decode("utf-8")
+	compressedSize = subfileHeader.subfileCompressedSize
+	dataOffset = f.tell()
+	if isinstance(f,BufferView):
+		available = len(f)-dataOffset
+		compressedData = f.slice(dataOffset,compressedSize).view
+	elif isinstance(getattr(f,"name",None),str) and os.path.isfile(f.name):
+		available = os.path.getsize(f.name)-dataOffset
+		compressedData = [f.name,dataOffset,compressedSize]
+	else:
+		compressedData = f.read(compressedSize)
+		available = len(compressedData)
+	if available < compressedSize: # no point even starting
+		raise ValueError("subfile "+subfileName+" is truncated: "+str(max(0,available))+" of "+str(compressedSize)+" compressed bytes are there")
+	return subfileName,subfileHeader.subfileSize,compressedData
+
+def compressed_chunks(compressedData):
+	if isinstance(compressedData,list):
+		filepath,dataOffset,compressedSize = compressedData
+		with open(filepath,"rb") as f:
+			f.seek(dataOffset)
+			remaining = compressedSize
+			while remaining > 0:
+				chunk = f.read(min(remaining,inflateChunkSize))
+				if not chunk:
+					raise ValueError("compressed data in "+filepath+" ended "+str(remaining)+" bytes early")
+				remaining -= len(chunk)
+				yield chunk
+	else:
+		compressedData = memoryview(compressedData)
+		for i in range(0,len(compressedData),inflateChunkSize):
+			yield compressedData[i:i+inflateChunkSize]
+
+# safe to run on another thread
+# inflates straight into a buffer of the claimed size, a bit at a time, so there's never a second copy of the whole thing and a bad size is caught as soon as it's passed
+def inflate_wismt_subfile(subfileName, subfileSize, compressedData):
+	content = bytearray(subfileSize)
+	inflated = 0
+	decompressor = zlib.decompressobj()
+	for chunk in compressed_chunks(compressedData):
+		while chunk and not decompressor.eof:
+			piece = decompressor.decompress(chunk,inflateChunkSize)
+			if inflated+len(piece) > subfileSize:
+				raise ValueError("subfile "+subfileName+" decompresses to more than its claimed size of "+str(subfileSize))
+			content[inflated:inflated+len(piece)] = piece
+			inflated += len(piece)
+			chunk = decompressor.unconsumed_tail
+		if decompressor.eof:
+			break
+	piece = decompressor.flush() # anything zlib was still holding on to
+	if inflated+len(piece) > subfileSize:
+		raise ValueError("subfile "+subfileName+" decompresses to more than its claimed size of "+str(subfileSize))
+	content[inflated:inflated+len(piece)] = piece
+	inflated += len(piece)
+	if not decompressor.eof or inflated != subfileSize:
+		raise ValueError("subfile "+subfileName+" did not decompress to its claimed size: "+str(inflated)+" != "+str(subfileSize))
 	return subfileName,content
 
+# starts a subfile inflating in the background, to be picked up later with inflateQueue.take(key)
+def queue_wismt_subfile(inflateQueue, key, f, headerOffset, headless=False):
+	subfileName,subfileSize,compressedData = locate_wismt_subfile(f,headerOffset,headless)
+	inflateQueue.add(key,subfileSize,inflate_wismt_subfile,subfileName,subfileSize,compressedData)
+
+# vertex descriptor types that we know what to do with: {vdType : [attribute name, numpy type, values per vertex]}
+# the descriptor sizes of these are ignored (they've always matched anyway), anything else gets skipped over using its size
+vertexDescriptorTypes = {
+	0:["position","<f4",3],
+	3:["weightIndex","<u4",1],
+	5:["uv0","<f4",2],
+	6:["uv1","<f4",2],
+	7:["uv2","<f4",2],
+	17:["colour","u1",4], # ARGB
+	28:["normal","i1",4], # XYZ + dummy
+	41:["weightValues","<u2",4], # weightTable verts only
+	42:["weightIDs","u1",4], # weightTable verts only
+	}
+
+# normals don't necessarily read as normalized (all-zero ones are left alone)
+def normalise_rows(values):
+	lengths = numpy.sqrt((values*values).sum(axis=1,keepdims=True))
+	return numpy.divide(values,lengths,out=values,where=lengths > 0)
+
+# the shape data normals go 0 to 255 instead of -128 to 127
+def decode_unsigned_normals(values):
+	return normalise_rows((values/255.0)*2-1)
+
+# shape basis entries: position then normal, the rest of the block is unknown
+def shape_basis_dtype(blockSize):
+	return numpy.dtype({"names":["position","normal"],"formats":[("<f4",(3,)),("u1",(3,))],"offsets":[0,12],"itemsize":blockSize})
+# shape target entries: position (relative to the basis), dummy, normal, dummies, then the index of the vertex being moved
+shapeTargetDtype = numpy.dtype({"names":["position","normal","index"],"formats":[("<f4",(3,)),("u1",(3,)),"<u4"],"offsets":[0,16,28],"itemsize":32})
+
+# turns a vertex descriptor list into a numpy type for a whole vertex, so a table can be read in one go
+def build_vertex_dtype(vertexDescriptors):
+	names = []
+	formats = []
+	offsets = []
+	unknownTypes = {}
+	vertexSize = 0
+	for vdType,vdSize in vertexDescriptors:
+		if vdType in vertexDescriptorTypes:
+			name,valueType,valueCount = vertexDescriptorTypes[vdType]
+			if name in names: # the same thing twice (hopefully never), the last one wins
+				repeat = names.index(name)
+				del names[repeat],formats[repeat],offsets[repeat]
+			names.append(name)
+			formats.append((valueType,(valueCount,)) if valueCount > 1 else valueType)
+			offsets.append(vertexSize)
+			vertexSize += numpy.dtype(valueType).itemsize*valueCount
+		else: # left as a gap
+			unknownTypes[vdType] = vdSize
+			vertexSize += vdSize
+	return numpy.dtype({"names":names,"formats":formats,"offsets":offsets,"itemsize":vertexSize}),unknownTypes
+
+# reads a whole vertex table at once, returns {attribute name : array (one row per vertex, not tied to data)} (only for the attributes the table has) and the unknown types
+# positions are left as they were, UVs have Y flipped, colours become RGBA, normals are normalised, weight values go to 0-1
+def decode_vertex_table(data, offset, vertexCount, vertexDescriptors):
+	vertexType,unknownTypes = build_vertex_dtype(vertexDescriptors)
+	if vertexType.itemsize == 0: # nothing to read
+		vertices = numpy.zeros(vertexCount,dtype=vertexType)
+	else:
+		vertices = numpy.frombuffer(data,dtype=vertexType,count=vertexCount,offset=offset)
+	attributes = {}
+	for name in vertexType.names:
+		values = vertices[name]
+		if name == "weightIndex":
+			values = values.astype(numpy.int64)
+		elif name.startswith("uv"): # inverted Y reminder
+			values = values.astype(numpy.float64)
+			values[:,1] = 1.0-values[:,1]
+		elif name == "colour":
+			values = values[:,[1,2,3,0]]
+		elif name == "normal":
+			values = normalise_rows(values[:,:3]/128.0)
+		elif name == "weightValues":
+			values = values/65535.0
+		else: # copied out of the subfile, so it can be changed (and so the subfile can go)
+			values = values.copy()
+		attributes[name] = values
+	return attributes,unknownTypes
+
 def import_wismt(f, wimdoResults, context):
 	filename = os.path.splitext(os.path.basename(f.name))[0]
 	game = context.scene.monado_forge_main.game
@@ -432,27 +500,19 @@ def import_wismt(f, wimdoResults, context):
 		texPath = bpy.path.abspath(context.scene.monado_forge_import.texturePath)
 	differentiate = context.scene.monado_forge_import.differentiateTextures
 	splitTemps = context.scene.monado_forge_import.splitTemps
-	listOfCachedTextureNames = [] # only needed for XC3 but no harm in building it regardless
+	cachedTextureSizes = {} # dict of {internal texture name : [width,height]} for the cached (smallest) textures; the names are needed for XC3 too
+	maxTextureSize = context.scene.monado_forge_import.maxTextureSize
 	# little endian assumed
 	# renamed some stuff from older programs to make more sense:
 	# data items -> content pointers
 	# TOC -> subfile headers
-	magic = f.read(4)
-	if magic != b"DRSM":
+	header = drsmHeaderLayout.read(f)
+	if header.magic != b"DRSM":
 		raise ValueError("Not a valid .wismt file (unexpected header)")
-	version = readAndParseInt(f,4)
-	headerSize = readAndParseInt(f,4)
-	mainOffset = readAndParseInt(f,4)
-	tag = readAndParseInt(f,4)
-	revision = readAndParseInt(f,4)
-	contentPointersCount = readAndParseInt(f,4)
-	contentPointersOffset = readAndParseInt(f,4)
-	subfileCount = readAndParseInt(f,4)
-	subfileHeadersOffset = readAndParseInt(f,4)
-	f.seek(f.tell()+7*4)
-	textureIDsCount = readAndParseInt(f,4)
-	textureIDsOffset = readAndParseInt(f,4)
-	textureCountOffset = readAndParseInt(f,4)
+	mainOffset = header.mainOffset
+	subfileHeadersOffset = header.subfileHeadersOffset
+	textureIDsOffset = header.textureIDsOffset
+	textureCountOffset = header.textureCountOffset
 	
 	# here is the deal:
 	# content pointers can be models, shaders, cached textures, or uncached textures
@@ -463,32 +523,23 @@ def import_wismt(f, wimdoResults, context):
 	
 	contentPointers = []
 	hasContentType = [False,False,False,False] # model, shader, cached texture, uncached texture
-	if contentPointersCount > 0:
-		for i in range(contentPointersCount):
-			f.seek(mainOffset+contentPointersOffset+i*5*4)
-			internalOffset = readAndParseInt(f,4)
-			contentSize = readAndParseInt(f,4)
-			highResSubfileIndex = readAndParseInt(f,2) - 1 # the -1 is needed to align properly
-			contentType = readAndParseInt(f,2)
+	if header.contentPointersCount > 0:
+		f.seek(mainOffset+header.contentPointersOffset)
+		for i in range(header.contentPointersCount):
+			internalOffset,contentSize,highResSubfileIndex,contentType = drsmContentPointerLayout.read(f)
+			highResSubfileIndex -= 1 # the -1 is needed to align properly
 			hasContentType[contentType] = True
 			contentPointers.append([internalOffset,contentSize,highResSubfileIndex,contentType])
 	textureIDList = []
 	if textureIDsOffset > 0 and not context.scene.monado_forge_import.skipMaterialImport:
 		f.seek(mainOffset+textureIDsOffset)
-		for i in range(textureIDsCount):
-			textureIDList.append(readAndParseInt(f,2))
+		textureIDList = list(struct.unpack("<"+str(header.textureIDsCount)+"H",f.read(header.textureIDsCount*2)))
 	textureHeaders = []
 	if textureCountOffset > 0 and not context.scene.monado_forge_import.skipMaterialImport:
 		f.seek(mainOffset+textureCountOffset)
-		textureCount = readAndParseInt(f,4)
-		textureChunkSize = readAndParseInt(f,4)
-		textureUnknown = readAndParseInt(f,4)
-		textureStringsOffset = readAndParseInt(f,4)
+		textureCount = drsmTextureTableHeaderLayout.read(f).textureCount
 		for i in range(textureCount):
-			textureUnknown1 = readAndParseInt(f,4)
-			textureFilesize = readAndParseInt(f,4)
-			textureOffset = readAndParseInt(f,4)
-			textureNameOffset = readAndParseInt(f,4)
+			textureUnknown1,textureFilesize,textureOffset,textureNameOffset = drsmTextureHeaderLayout.read(f)
 			tempOffset = f.tell()
 			f.seek(mainOffset+textureCountOffset+textureNameOffset)
 			textureName = readStr(f)
@@ -497,418 +548,335 @@ def import_wismt(f, wimdoResults, context):
 		# not really sure why this is here, but it's in XBC2MD, so there must be a reason for it
 		# special case: if these offsets are the same, the IDs are in a different spot than usual (i.e. here right after the headers)
 		if textureIDsOffset == textureCountOffset:
-			textureIDList = []
-			for i in range(textureCount):
-				textureIDList.append(readAndParseInt(f,2))
+			textureIDList = list(struct.unpack("<"+str(textureCount)+"H",f.read(textureCount*2)))
 	
 	textureAlignment = {} # dict of {internal texture name : final name of image as it is in the Blender file}
+	textureCache = None
+	if context.scene.monado_forge_import.useTextureCache:
+		textureCache = TextureCache(bpy.path.abspath(context.scene.monado_forge_import.textureCachePath),context.scene.monado_forge_import.textureCacheSize*1024*1024)
+	textureQueue = TextureDecodeQueue(context.scene.monado_forge_import.textureDecodeWorkers,context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,cache=textureCache,keepCompressed=context.scene.monado_forge_import.keepTexturesCompressed,compressionLevel=context.scene.monado_forge_import.pngCompression)
+	inflateQueue = SubfileInflateQueue(subfileInflateBudget)
+	externalFiles = [] # the XC3 texture files still open for the inflate queue to read from
 	
-	meshes = []
-	vertexWeights = []
-	maxUVLayers = 0 # materials will need to know this without knowing what meshes they're on
-	nextSubfileIndex = 0
-	hasRootSubfile = hasContentType[0] or hasContentType[1] or hasContentType[2]
-	hasUncachedTexSubfile = hasContentType[3]
-	if hasRootSubfile:
-		subfileHeaderOffset = mainOffset+subfileHeadersOffset+nextSubfileIndex*3*4
-		subfileName,subfileData = extract_wismt_subfile(f,subfileHeaderOffset)
-		for cp in contentPointers:
-			internalOffset,contentSize,highResSubfileIndex,contentType = cp
-			if contentType == 0: # model
-				data = subfileData[internalOffset:internalOffset+contentSize]
-				if printProgress:
-					print("Opening model subfile.")
-				sf = io.BytesIO(data)
-				try: # no except, just finally (to close sf)
-					vertexTableOffset = readAndParseInt(sf,4)
-					vertexTableCount = readAndParseInt(sf,4)
-					faceTableOffset = readAndParseInt(sf,4)
-					faceTableCount = readAndParseInt(sf,4)
-					sf.seek(sf.tell()+6*4)
-					shapeDataOffset = readAndParseInt(sf,4)
-					dataSize = readAndParseInt(sf,4)
-					dataOffset = readAndParseInt(sf,4)
-					weightDataSize = readAndParseInt(sf,4)
-					weightDataOffset = readAndParseInt(sf,4)
-					# another 0x14 mystery reads
-					vertexTables = []
-					faceTables = []
-					weightTables = []
-					shapeHeaders = []
-					shapeTargets = []
-					shapes = []
-					if vertexTableOffset > 0: # not sure how we can have a mesh without vertexes, but just in case
-						for i in range(vertexTableCount):
-							sf.seek(vertexTableOffset+i*8*4)
-							vtDataOffset = readAndParseInt(sf,4)
-							vtDataCount = readAndParseInt(sf,4)
-							vtBlockSize = readAndParseInt(sf,4)
-							vtDescOffset = readAndParseInt(sf,4)
-							vtDescCount = readAndParseInt(sf,4)
-							# 3 unknowns
-							sf.seek(vtDescOffset)
-							vertexDescriptors = []
-							for j in range(vtDescCount):
-								vdType = readAndParseInt(sf,2)
-								vdSize = readAndParseInt(sf,2)
-								vertexDescriptors.append([vdType,vdSize])
-							vertexTables.append([vtDataOffset,vtDataCount,vtBlockSize,vtDescOffset,vtDescCount,vertexDescriptors])
-						if printProgress:
-							print("Found "+str(len(vertexTables))+" vertex tables.")
-					if faceTableOffset > 0:
-						for i in range(faceTableCount):
-							sf.seek(faceTableOffset+i*5*4)
-							ftDataOffset = readAndParseInt(sf,4)
-							ftVertCount = readAndParseInt(sf,4)
-							# 3 unknowns
-							sf.seek(dataOffset+ftDataOffset)
-							ftVertexes = []
-							for j in range(ftVertCount):
-								ftVertexes.append(readAndParseInt(sf,2))
-							faceTables.append([ftDataOffset,ftVertCount,ftVertexes])
-						if printProgress:
-							print("Found "+str(len(faceTables))+" face tables.")
-					if weightDataOffset > 0:
-						sf.seek(weightDataOffset)
-						weightTableCount = readAndParseInt(sf,4)
-						weightTableOffset = readAndParseInt(sf,4)
-						weightVertTableIndex = readAndParseInt(sf,2)
-						# then a couple unknowns
-						sf.seek(weightTableOffset)
-						for i in range(weightTableCount):
-							# buncha unknowns in here, might not use it necessarily
-							sf.seek(sf.tell()+4)
-							wtDataOffset = readAndParseInt(sf,4)
-							wtDataCount = readAndParseInt(sf,4)
-							sf.seek(sf.tell()+17)
-							wtLOD = readAndParseInt(sf,1)
-							sf.seek(sf.tell()+10)
-							weightTables.append([wtDataOffset,wtDataCount,wtLOD])
-						if printProgress:
-							print("Found "+str(len(weightTables))+" weight tables.")
-						if len(weightTables) > 1:
-							print_warning("You may need to use the Weight Table Override feature to get correct weights for some meshes.\nMake a new import for each table, and keep only the valid meshes.")
-					if shapeDataOffset > 0:
-						sf.seek(shapeDataOffset)
-						shapeHeaderCount = readAndParseInt(sf,4)
-						shapeHeaderOffset = readAndParseInt(sf,4)
-						shapeTargetCount = readAndParseInt(sf,4)
-						shapeTargetOffset = readAndParseInt(sf,4)
-						sf.seek(shapeHeaderOffset)
-						for i in range(shapeHeaderCount):
-							shapeDataChunkID = readAndParseInt(sf,4)
-							shapeTargetIndex = readAndParseInt(sf,4)
-							shapeTargetCounts = readAndParseInt(sf,4)
-							shapeTargetIDOffset = readAndParseInt(sf,4)
-							dummy = readAndParseInt(sf,4)
-							shapeHeaders.append([shapeDataChunkID,shapeTargetIndex,shapeTargetCounts,shapeTargetIDOffset])
-						sf.seek(shapeTargetOffset)
-						for i in range(shapeTargetCount):
-							targetDataChunkOffset = readAndParseInt(sf,4)
-							targetVertexCount = readAndParseInt(sf,4)
-							targetBlockSize = readAndParseInt(sf,4)
-							targetUnknown = readAndParseInt(sf,2)
-							targetType = readAndParseInt(sf,2)
-							shapeTargets.append([targetDataChunkOffset,targetVertexCount,targetBlockSize,targetUnknown,targetType])
-						if printProgress:
-							print("Found "+str(len(shapeTargets))+" shapekeys.")
-					
-					# tables ready, now read the actual data
-					unknownVDTypes = {}
-					vertexData = {}
-					faceData = {}
-					vertexWeightData = {} # assumption: a single vertex cannot both contain actual data and be one of the "weight container only" vertices
-					for i in range(len(vertexTables)):
-						vertexData[i] = []
-						vertexWeightData[i] = []
-						vtDataOffset,vtDataCount,vtBlockSize,vtDescOffset,vtDescCount,vertexDescriptors = vertexTables[i]
-						newMesh = MonadoForgeMesh()
-						sf.seek(dataOffset+vtDataOffset)
-						for j in range(vtDataCount):
-							newVertex = MonadoForgeVertex()
-							weightVertex = [[],[]]
-							hasUVLayers = [False,False,False]
-							for vd in vertexDescriptors:
-								vdType,vdSize = vd
-								if vdType == 0: # position
-									newVertex.setPosition([readAndParseFloat(sf),readAndParseFloat(sf),readAndParseFloat(sf)])
-								elif vdType == 3: # weights index
-									newVertex.setWeightSetIndex(readAndParseInt(sf,4))
-								elif vdType == 5: # UV 1 (inverted Y reminder) (yes this is copy/pasted for other layers but this is kind of easier actually)
-									newVertex.setUV(0,[readAndParseFloat(sf),1.0-readAndParseFloat(sf)])
-									hasUVLayers[0] = True
-								elif vdType == 6: # UV 2
-									newVertex.setUV(1,[readAndParseFloat(sf),1.0-readAndParseFloat(sf)])
-									hasUVLayers[1] = True
-								elif vdType == 7: # UV 3
-									newVertex.setUV(2,[readAndParseFloat(sf),1.0-readAndParseFloat(sf)])
-									hasUVLayers[2] = True
-								elif vdType == 17: # colour
-									a,r,g,b = readAndParseInt(sf,1),readAndParseInt(sf,1),readAndParseInt(sf,1),readAndParseInt(sf,1)
-									newVertex.setColour([r,g,b,a])
-								elif vdType == 28: # normals
-									newNormal = [readAndParseInt(sf,1,signed=True)/128.0,readAndParseInt(sf,1,signed=True)/128.0,readAndParseInt(sf,1,signed=True)/128.0]
-									readAndParseInt(sf,1,signed=True) # dummy
-									# doesn't necessarily read as normalized
-									newVertex.setNormal(mathutils.Vector(newNormal).normalized()[:])
-								elif vdType == 41: # weight values (weightTable verts only)
-									weightVertex[1] = [readAndParseInt(sf,2)/65535.0,readAndParseInt(sf,2)/65535.0,readAndParseInt(sf,2)/65535.0,readAndParseInt(sf,2)/65535.0]
-								elif vdType == 42: # weight IDs (weightTable verts only)
-									weightVertex[0] = [readAndParseInt(sf,1),readAndParseInt(sf,1),readAndParseInt(sf,1),readAndParseInt(sf,1)]
-								else:
-									unknownVDTypes[vdType] = vdSize
-									sf.seek(sf.tell()+vdSize)
-							newMesh.addVertex(newVertex)
-							vertexData[i].append(newVertex)
-							vertexWeightData[i].append(weightVertex)
-							maxUVLayers = max(maxUVLayers,sum(hasUVLayers))
-					if printProgress and vertexData != {}:
-						print("Finished reading vertex data.")
-					if unknownVDTypes:
-						print_warning("unknownVDTypes: "+str(unknownVDTypes))
-					for i in range(len(faceTables)):
-						faceData[i] = []
-						ftDataOffset,ftVertCount,ftVertexes = faceTables[i]
-						for j in range(0,len(ftVertexes),3):
-							newFace = MonadoForgeFace()
-							newFace.setVertexIndexes([ftVertexes[j],ftVertexes[j+1],ftVertexes[j+2]])
-							faceData[i].append(newFace)
-					if printProgress and faceData != {}:
-						print("Finished reading face data.")
-					for i in range(len(shapeHeaders)):
-						shapeDataChunkID,shapeTargetIndex,shapeTargetCounts,shapeTargetIDOffset = shapeHeaders[i]
-						targetDataChunkOffset,targetVertexCount,targetBlockSize,targetUnknown,targetType = shapeTargets[shapeTargetIndex]
-						sf.seek(shapeTargetIDOffset)
-						targetIDs = []
-						for j in range(shapeTargetCounts):
-							targetIDs.append(readAndParseInt(sf,2))
-						sf.seek(dataOffset+targetDataChunkOffset)
-						# first, get the base shape
-						# it seems that "has shapes" is the difference for whether normals are signed or not
-						for j in range(targetVertexCount):
-							vertexBeingModified = vertexData[shapeDataChunkID][j]
-							vertexBeingModified.setPosition([readAndParseFloat(sf),readAndParseFloat(sf),readAndParseFloat(sf)])
-							newNormal = [(readAndParseInt(sf,1)/255.0)*2-1,(readAndParseInt(sf,1)/255.0)*2-1,(readAndParseInt(sf,1)/255.0)*2-1]
-							# doesn't necessarily read as normalized
-							vertexBeingModified.setNormal(mathutils.Vector(newNormal).normalized()[:])
-							sf.seek(sf.tell()+targetBlockSize-15) # the magic -15 is the length of the position+normal (4*3 + 3)
-						shapeNameList = ["basis"] + [h[0] for h in wimdoResults.getShapeHeaders()] # "basis" needs to be added because the first target is also the base shape for some reason
-						for j in range(shapeTargetCounts+1):
-							if j == 0: continue # as above, the first is the basis so we don't need it
-							# it's okay to overwrite these variables, we don't need the above ones anymore
-							targetDataChunkOffset,targetVertexCount,targetBlockSize,targetUnknown,targetType = shapeTargets[shapeTargetIndex+j+1]
-							sf.seek(dataOffset+targetDataChunkOffset)
-							newShape = MonadoForgeMeshShape()
-							for k in range(targetVertexCount):
-								newVertex = MonadoForgeVertex()
-								newVertex.setPosition([readAndParseFloat(sf),readAndParseFloat(sf),readAndParseFloat(sf)])
-								readAndParseInt(sf,4) # dummy
-								newNormal = [(readAndParseInt(sf,1)/255.0)*2-1,(readAndParseInt(sf,1)/255.0)*2-1,(readAndParseInt(sf,1)/255.0)*2-1]
-								readAndParseInt(sf,1) # more dummies
-								readAndParseInt(sf,4)
-								readAndParseInt(sf,4)
-								index = readAndParseInt(sf,4)
-								# doesn't necessarily read as normalized
-								newVertex.setNormal(mathutils.Vector(newNormal).normalized()[:])
-								newShape.addVertex(index,newVertex)
-							newShape.setVertexTableIndex(shapeDataChunkID)
-							newShape.setName(shapeNameList[j]) # probably wrong but need to find a counterexample
-							shapes.append(newShape)
-					if printProgress and shapes != []:
-						print("Finished reading shape data.")
-					shapesByVertexTableIndex = {}
-					for s in shapes:
-						thisShapesIndex = s.getVertexTableIndex()
-						if thisShapesIndex in shapesByVertexTableIndex.keys():
-							shapesByVertexTableIndex[thisShapesIndex].append(s)
-						else:
-							shapesByVertexTableIndex[thisShapesIndex] = [s]
+	try: # no except, just finally (so nothing's left running or taking up memory if something goes wrong)
+		meshes = []
+		maxUVLayers = 0 # materials will need to know this without knowing what meshes they're on
+		nextSubfileIndex = 0
+		hasRootSubfile = hasContentType[0] or hasContentType[1] or hasContentType[2]
+		hasUncachedTexSubfile = hasContentType[3]
+		wantUncachedTextures = context.scene.monado_forge_import.importUncachedTextures and not context.scene.monado_forge_import.skipMaterialImport
+		# get every subfile that's definitely needed inflating up front, so the later ones are (hopefully) ready by the time the earlier ones have been parsed
+		if hasRootSubfile:
+			queue_wismt_subfile(inflateQueue,0,f,mainOffset+subfileHeadersOffset)
+		if hasUncachedTexSubfile and wantUncachedTextures and maxTextureSize == 0: # with a max size, whether it's needed depends on the cached textures, so that has to wait
+			uncachedSubfileIndex = 1 if hasRootSubfile else 0
+			queue_wismt_subfile(inflateQueue,uncachedSubfileIndex,f,mainOffset+subfileHeadersOffset+uncachedSubfileIndex*3*4)
+		if hasRootSubfile:
+			subfileName,subfileData = inflateQueue.take(nextSubfileIndex)
+			subfileData = BufferView(subfileData) # everything below reads out of this without copying
+			for cp in contentPointers:
+				internalOffset,contentSize,highResSubfileIndex,contentType = cp
+				if contentType == 0: # model
+					if printProgress:
+						print("Opening model subfile.")
+					sf = subfileData.slice(internalOffset,contentSize)
+					try: # no except, just finally (to close sf)
+						vertexTableOffset,vertexTableCount,faceTableOffset,faceTableCount,shapeDataOffset,dataSize,dataOffset,weightDataSize,weightDataOffset = modelHeaderLayout.read(sf)
+						# another 0x14 mystery reads
+						vertexTables = []
+						faceTables = []
+						weightTables = []
+						shapeHeaders = []
+						shapeTargets = []
+						shapes = []
+						if vertexTableOffset > 0: # not sure how we can have a mesh without vertexes, but just in case
+							for i in range(vertexTableCount):
+								vtDataOffset,vtDataCount,vtBlockSize,vtDescOffset,vtDescCount = vertexTableLayout.unpack_from(sf,vertexTableOffset+i*vertexTableLayout.size) # then 3 unknowns
+								vertexDescriptors = []
+								for j in range(vtDescCount):
+									vertexDescriptors.append(list(vertexDescriptorLayout.unpack_from(sf,vtDescOffset+j*vertexDescriptorLayout.size)))
+								vertexTables.append([vtDataOffset,vtDataCount,vtBlockSize,vtDescOffset,vtDescCount,vertexDescriptors])
+							if printProgress:
+								print("Found "+str(len(vertexTables))+" vertex tables.")
+						if faceTableOffset > 0:
+							for i in range(faceTableCount):
+								ftDataOffset,ftVertCount = faceTableLayout.unpack_from(sf,faceTableOffset+i*faceTableLayout.size) # then 3 unknowns
+								# straight out of the subfile rather than copied (so it stays alive until the meshes are done with)
+								ftVertexes = numpy.frombuffer(sf.view,dtype="<u2",count=ftVertCount//3*3,offset=dataOffset+ftDataOffset).reshape(-1,3)
+								faceTables.append([ftDataOffset,ftVertCount,ftVertexes])
+							if printProgress:
+								print("Found "+str(len(faceTables))+" face tables.")
+						if weightDataOffset > 0:
+							weightTableCount,weightTableOffset,weightVertTableIndex = weightDataHeaderLayout.unpack_from(sf,weightDataOffset) # then a couple unknowns
+							for i in range(weightTableCount):
+								# buncha unknowns in here, might not use it necessarily
+								weightTables.append(list(weightTableLayout.unpack_from(sf,weightTableOffset+i*weightTableLayout.size)))
+							if printProgress:
+								print("Found "+str(len(weightTables))+" weight tables.")
+							if len(weightTables) > 1:
+								print_warning("You may need to use the Weight Table Override feature to get correct weights for some meshes.\nMake a new import for each table, and keep only the valid meshes.")
+						if shapeDataOffset > 0:
+							shapeHeaderCount,shapeHeaderOffset,shapeTargetCount,shapeTargetOffset = shapeDataHeaderLayout.unpack_from(sf,shapeDataOffset)
+							for i in range(shapeHeaderCount):
+								shapeHeaders.append(list(shapeHeaderLayout.unpack_from(sf,shapeHeaderOffset+i*shapeHeaderLayout.size))[:4]) # the last one's a dummy
+							for i in range(shapeTargetCount):
+								shapeTargets.append(list(shapeTargetLayout.unpack_from(sf,shapeTargetOffset+i*shapeTargetLayout.size)))
+							if printProgress:
+								print("Found "+str(len(shapeTargets))+" shapekeys.")
 					
-					unusedVertexTables = [k for k in vertexData.keys()]
-					unusedFaceTables = [k for k in faceData.keys()]
-					bestLOD = wimdoResults.getBestLOD()
-					# do the special weight table vertices first
-					if weightDataOffset > 0: # has weights
-						unusedVertexTables.remove(weightVertTableIndex)
-						for v in range(len(vertexWeightData[weightVertTableIndex])):
-							vertexWeights.append([vertexWeightData[weightVertTableIndex][v][0],vertexWeightData[weightVertTableIndex][v][1]])
-					# we don't know how to pick the right weight table, so for now we let the user pick which one to use for all (needing multiple imports to do it right)
-					forcedWeightTable = context.scene.monado_forge_import.tempWeightTableOverride
-					if forcedWeightTable > 0:
-						if forcedWeightTable >= len(weightTables):
-							print_warning("weight table override too high, ignoring and treating as 0")
-						else:
-							totalOffset = weightTables[forcedWeightTable][0]
-							vertexWeights = vertexWeights[totalOffset:]
-					# we can "bake" the vertices with their weights now (but they keep the index in case it's more useful later)
-					badWeightTable = False
-					for i,vertices in vertexData.items():
-						for v in vertices:
-							weightIndex = v.getWeightSetIndex()
-							if weightIndex == -1: continue
-							try:
-								for j in range(len(vertexWeights[weightIndex][0])):
-									if vertexWeights[weightIndex][1][j] > 0:
-										v.setWeight(vertexWeights[weightIndex][0][j],vertexWeights[weightIndex][1][j])
-							except IndexError:
-								badWeightTable = True
-					if badWeightTable:
-						print_warning("some vertices will not have weights due to the chosen weight table being too small")
-					# now for the meshes themselves
-					for md in wimdoResults.getMeshHeaders():
-						vtIndex = md.getMeshVertTableIndex()
-						ftIndex = md.getMeshFaceTableIndex()
-						mtIndex = md.getMeshMaterialIndex()
-						if vtIndex in unusedVertexTables:
-							unusedVertexTables.remove(vtIndex)
-						if ftIndex in unusedFaceTables:
-							unusedFaceTables.remove(ftIndex)
-						# this order of operations means that tables are still marked as "used" even if they're of dropped LODs
-						if not context.scene.monado_forge_import.alsoImportLODs:
-							if md.getMeshLODValue() > bestLOD:
+						# tables ready, now read the actual data
+						unknownVDTypes = {}
+						vertexData = {}
+						faceData = {}
+						vertexWeightData = {} # assumption: a single vertex cannot both contain actual data and be one of the "weight container only" vertices
+						for i in range(len(vertexTables)):
+							vertexData[i] = MonadoForgeMesh() # just a holder for the table's vertices, the actual meshes share its arrays
+							vertexWeightData[i] = (numpy.full((vertexTables[i][1],4),-1,dtype=numpy.int64),numpy.zeros((vertexTables[i][1],4)))
+							vtDataOffset,vtDataCount,vtBlockSize,vtDescOffset,vtDescCount,vertexDescriptors = vertexTables[i]
+							if vtDataCount == 0:
 								continue
-						newMesh = MonadoForgeMesh()
-						newMesh.setVertices(vertexData[vtIndex])
-						newMesh.setFaces(faceData[ftIndex])
-						newMesh.setWeightSets(vertexWeights)
-						newMesh.setMaterialIndex(mtIndex)
-						if vtIndex in shapesByVertexTableIndex.keys():
-							newMesh.setShapes(shapesByVertexTableIndex[vtIndex])
-						meshes.append(newMesh)
-					if unusedVertexTables:
-						print("Unused vertex tables: "+str(unusedVertexTables))
-					if unusedFaceTables:
-						print("Unused face tables: "+str(unusedFaceTables))
+							vertexAttributes,unknownTypes = decode_vertex_table(sf.view,dataOffset+vtDataOffset,vtDataCount,vertexDescriptors)
+							unknownVDTypes.update(unknownTypes)
+							vertexData[i].setVertexPositions(vertexAttributes.get("position",numpy.zeros((vtDataCount,3),dtype=numpy.float32))) # having position ever be None seems to cause Problems
+							vertexData[i].setVertexWeightSetIndexes(vertexAttributes.get("weightIndex"))
+							uvLayers = 0
+							for name,values in vertexAttributes.items():
+								if name.startswith("uv"):
+									vertexData[i].setVertexUVs(int(name[2:]),values)
+									uvLayers += 1
+							vertexData[i].setVertexColours(vertexAttributes.get("colour"))
+							vertexData[i].setVertexNormals(vertexAttributes.get("normal"))
+							maxUVLayers = max(maxUVLayers,uvLayers)
+							if "weightIDs" in vertexAttributes or "weightValues" in vertexAttributes:
+								# a table missing either half can't give any weights, so it stays as the empty defaults
+								if "weightIDs" in vertexAttributes and "weightValues" in vertexAttributes:
+									vertexWeightData[i] = (vertexAttributes["weightIDs"].astype(numpy.int64),vertexAttributes["weightValues"])
+						if printProgress and vertexData != {}:
+							print("Finished reading vertex data.")
+						if unknownVDTypes:
+							print_warning("unknownVDTypes: "+str(unknownVDTypes))
+						for i in range(len(faceTables)):
+							faceData[i] = faceTables[i][2] # one row per triangle
+						if printProgress and faceData != {}:
+							print("Finished reading face data.")
+						for i in range(len(shapeHeaders)):
+							shapeDataChunkID,shapeTargetIndex,shapeTargetCounts,shapeTargetIDOffset = shapeHeaders[i]
+							targetDataChunkOffset,targetVertexCount,targetBlockSize,targetUnknown,targetType = shapeTargets[shapeTargetIndex]
+							targetIDs = numpy.frombuffer(sf.view,dtype="<u2",count=shapeTargetCounts,offset=shapeTargetIDOffset)
+							# first, get the base shape
+							# it seems that "has shapes" is the difference for whether normals are signed or not
+							basis = numpy.frombuffer(sf.view,dtype=shape_basis_dtype(targetBlockSize),count=targetVertexCount,offset=dataOffset+targetDataChunkOffset)
+							basisMesh = vertexData[shapeDataChunkID]
+							basisMesh.getVertexPositions()[:targetVertexCount] = basis["position"]
+							if not basisMesh.hasNormals():
+								basisMesh.setVertexNormals(numpy.zeros((basisMesh.getVertexCount(),3)))
+							basisMesh.getVertexNormals()[:targetVertexCount] = decode_unsigned_normals(basis["normal"])
+							shapeNameList = ["basis"] + [h[0] for h in wimdoResults.getShapeHeaders()] # "basis" needs to be added because the first target is also the base shape for some reason
+							for j in range(shapeTargetCounts+1):
+								if j == 0: continue # as above, the first is the basis so we don't need it
+								# it's okay to overwrite these variables, we don't need the above ones anymore
+								targetDataChunkOffset,targetVertexCount,targetBlockSize,targetUnknown,targetType = shapeTargets[shapeTargetIndex+j+1]
+								target = numpy.frombuffer(sf.view,dtype=shapeTargetDtype,count=targetVertexCount,offset=dataOffset+targetDataChunkOffset)
+								newShape = MonadoForgeMeshShape()
+								newShape.setVertexData(target["index"],target["position"],decode_unsigned_normals(target["normal"]))
+								newShape.setVertexTableIndex(shapeDataChunkID)
+								newShape.setName(shapeNameList[j]) # probably wrong but need to find a counterexample
+								shapes.append(newShape)
+						if printProgress and shapes != []:
+							print("Finished reading shape data.")
+						shapesByVertexTableIndex = {}
+						for s in shapes:
+							thisShapesIndex = s.getVertexTableIndex()
+							if thisShapesIndex in shapesByVertexTableIndex.keys():
+								shapesByVertexTableIndex[thisShapesIndex].append(s)
+							else:
+								shapesByVertexTableIndex[thisShapesIndex] = [s]
+					
+						unusedVertexTables = [k for k in vertexData.keys()]
+						unusedFaceTables = [k for k in faceData.keys()]
+						bestLOD = wimdoResults.getBestLOD()
+						# do the special weight table vertices first
+						# weight sets are kept as (K,4) group and value arrays, the vertices just refer to them by index
+						weightSetGroups = numpy.zeros((0,4),dtype=numpy.int64)
+						weightSetValues = numpy.zeros((0,4))
+						if weightDataOffset > 0: # has weights
+							unusedVertexTables.remove(weightVertTableIndex)
+							weightSetGroups,weightSetValues = vertexWeightData[weightVertTableIndex]
+						# we don't know how to pick the right weight table, so for now we let the user pick which one to use for all (needing multiple imports to do it right)
+						forcedWeightTable = context.scene.monado_forge_import.tempWeightTableOverride
+						if forcedWeightTable > 0:
+							if forcedWeightTable >= len(weightTables):
+								print_warning("weight table override too high, ignoring and treating as 0")
+							else:
+								totalOffset = weightTables[forcedWeightTable][0]
+								# views rather than copies, so this is just an offset into the same arrays
+								weightSetGroups = weightSetGroups[totalOffset:]
+								weightSetValues = weightSetValues[totalOffset:]
+						# we can "bake" the vertices with their weights now (but they keep the index in case it's more useful later)
+						badWeightCount = 0
+						for i,tableMesh in vertexData.items():
+							weightIndexes = tableMesh.getVertexWeightSetIndexes()
+							if weightIndexes is None: continue
+							hasWeightIndex = weightIndexes != -1
+							inRange = hasWeightIndex & (weightIndexes < len(weightSetGroups))
+							badWeightCount += int(numpy.count_nonzero(hasWeightIndex & ~inRange))
+							if not inRange.any(): continue
+							bakedGroups = numpy.full((len(weightIndexes),4),-1,dtype=numpy.int64)
+							bakedValues = numpy.zeros((len(weightIndexes),4))
+							bakedGroups[inRange] = weightSetGroups[weightIndexes[inRange]]
+							bakedValues[inRange] = weightSetValues[weightIndexes[inRange]]
+							bakedGroups[bakedValues <= 0] = -1 # zero weights aren't worth keeping
+							bakedValues[bakedValues <= 0] = 0
+							tableMesh.setVertexWeights(bakedGroups,bakedValues)
+						if badWeightCount > 0:
+							print_warning(str(badWeightCount)+" vertices will not have weights due to the chosen weight table being too small")
+						# now for the meshes themselves
+						for md in wimdoResults.getMeshHeaders():
+							vtIndex = md.getMeshVertTableIndex()
+							ftIndex = md.getMeshFaceTableIndex()
+							mtIndex = md.getMeshMaterialIndex()
+							if vtIndex in unusedVertexTables:
+								unusedVertexTables.remove(vtIndex)
+							if ftIndex in unusedFaceTables:
+								unusedFaceTables.remove(ftIndex)
+							# this order of operations means that tables are still marked as "used" even if they're of dropped LODs
+							if not context.scene.monado_forge_import.alsoImportLODs:
+								if md.getMeshLODValue() > bestLOD:
+									continue
+							newMesh = MonadoForgeMesh()
+							newMesh.setVertices(vertexData[vtIndex])
+							newMesh.setFaces(faceData[ftIndex])
+							newMesh.setWeightSets(weightSetGroups,weightSetValues)
+							newMesh.setMaterialIndex(mtIndex)
+							if vtIndex in shapesByVertexTableIndex.keys():
+								newMesh.setShapes(shapesByVertexTableIndex[vtIndex])
+							meshes.append(newMesh)
+						if unusedVertexTables:
+							print("Unused vertex tables: "+str(unusedVertexTables))
+						if unusedFaceTables:
+							print("Unused face tables: "+str(unusedFaceTables))
+						if printProgress:
+							print("Finished processing mesh data.")
+					finally:
+						sf.close()
+				if contentType == 1: # shader
 					if printProgress:
-						print("Finished processing mesh data.")
-				finally:
-					sf.close()
-			if contentType == 1: # shader
-				data = subfileData[internalOffset:internalOffset+contentSize]
-				if printProgress:
-					print("Found shader chunk of size "+str(contentSize)+" (not supported, skipping)")
-				pass
-			if contentType == 2 and not context.scene.monado_forge_import.skipMaterialImport: # cached texture
-				data = subfileData[internalOffset:internalOffset+contentSize]
-				sf = io.BytesIO(data)
-				try: # no except, just finally (to close sf)
-					for i in range(len(textureHeaders)):
-						textureFilesize,textureOffset,textureNameOffset,textureName = textureHeaders[i]
-						# for some reason, this stuff is in reverse order: first data, then properties (in reverse order), and magic at end
-						sf.seek(textureOffset+textureFilesize-0x4)
-						submagic = sf.read(4)
-						if submagic != b"LBIM":
-							print_error("Bad cached texture (invalid subfilemagic); skipping "+str(textureName))
-						else:
-							sf.seek(textureOffset+textureFilesize-0x28)
-							subfileUnknown5 = readAndParseInt(sf,4)
-							subfileUnknown4 = readAndParseInt(sf,4)
-							imgWidth = readAndParseInt(sf,4)
-							imgHeight = readAndParseInt(sf,4)
-							subfileUnknown3 = readAndParseInt(sf,4)
-							subfileUnknown2 = readAndParseInt(sf,4)
-							imgType = readAndParseInt(sf,4)
-							subfileUnknown1 = readAndParseInt(sf,4)
-							imgVersion = readAndParseInt(sf,4)
-							sf.seek(textureOffset)
-							listOfCachedTextureNames.append(textureName)
-							dc = splitTemps and textureName.startswith("temp")
-							nameToUse = textureName
-							if differentiate:
-								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
-								nameToUse = os.path.join("res0",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(textureFilesize),context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
-				finally:
-					sf.close()
-		del subfileData # just to ensure it's cleaned up as soon as possible
-		nextSubfileIndex += 1
-	# reminder: XC3 doesn't go in here at all (at least for most models)
-	if hasUncachedTexSubfile and context.scene.monado_forge_import.importUncachedTextures and not context.scene.monado_forge_import.skipMaterialImport:
-		subfileHeaderOffset = mainOffset+subfileHeadersOffset+nextSubfileIndex*3*4
-		subfileName,subfileData = extract_wismt_subfile(f,subfileHeaderOffset)
-		for cpi,cp in enumerate(contentPointers):
-			internalOffset,contentSize,highResSubfileIndex,contentType = cp
-			if contentType == 3: # med-res texture
-				data = subfileData[internalOffset:internalOffset+contentSize]
-				sf = io.BytesIO(data)
-				try: # no except, just finally (to close sf)
+						print("Found shader chunk of size "+str(contentSize)+" (not supported, skipping)")
+					pass
+				if contentType == 2 and not context.scene.monado_forge_import.skipMaterialImport: # cached texture
+					sf = subfileData.slice(internalOffset,contentSize)
+					try: # no except, just finally (to close sf)
+						for i in range(len(textureHeaders)):
+							textureFilesize,textureOffset,textureNameOffset,textureName = textureHeaders[i]
+							# for some reason, this stuff is in reverse order: first data, then properties (in reverse order), and magic at end
+							footer = lbimFooterLayout.unpack_from(sf,textureOffset+textureFilesize-lbimFooterLayout.size)
+							if footer.magic != b"LBIM":
+								print_error("Bad cached texture (invalid subfilemagic); skipping "+str(textureName))
+							else:
+								imgWidth,imgHeight,imgType,imgVersion = footer.imgWidth,footer.imgHeight,footer.imgType,footer.imgVersion
+								sf.seek(textureOffset)
+								cachedTextureSizes[textureName] = [imgWidth,imgHeight]
+								dc = splitTemps and textureName.startswith("temp")
+								nameToUse = textureName
+								if differentiate:
+									nameToUse = filename+"_"+nameToUse
+								if context.scene.monado_forge_import.keepAllResolutions:
+									nameToUse = os.path.join("res0",nameToUse)
+								textureQueue.add(textureName,nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(textureFilesize),dechannelise=dc)
+					finally:
+						sf.close()
+			del subfileData # just to ensure it's cleaned up as soon as possible (once the texture queue is done with its views of it)
+			nextSubfileIndex += 1
+		# reminder: XC3 doesn't go in here at all (at least for most models)
+		# if every cached texture is already as big as the max size allows, don't even unpack the bigger ones
+		if hasUncachedTexSubfile and wantUncachedTextures and maxTextureSize > 0:
+			uncachedTextureNames = [textureHeaders[textureIDList[cpi-3]][3] for cpi,cp in enumerate(contentPointers) if cp[3] == 3]
+			hasUncachedTexSubfile = any(bigger_texture_wanted(cachedTextureSizes.get(textureName),maxTextureSize) for textureName in uncachedTextureNames)
+		if hasUncachedTexSubfile and wantUncachedTextures:
+			if not inflateQueue.has(nextSubfileIndex):
+				queue_wismt_subfile(inflateQueue,nextSubfileIndex,f,mainOffset+subfileHeadersOffset+nextSubfileIndex*3*4)
+			subfileName,subfileData = inflateQueue.take(nextSubfileIndex)
+			subfileData = BufferView(subfileData)
+			# work out which resolutions are wanted first, so every high-res subfile can be inflating before the first one is needed
+			uncachedTextures = []
+			for cpi,cp in enumerate(contentPointers):
+				internalOffset,contentSize,highResSubfileIndex,contentType = cp
+				if contentType == 3: # med-res texture
+					sf = subfileData.slice(internalOffset,contentSize)
 					textureName = textureHeaders[textureIDList[cpi-3]][3]
 					# for some reason, this stuff is in reverse order: first data, then properties (in reverse order), and magic at end
-					sf.seek(contentSize-0x4)
-					submagic = sf.read(4)
-					if submagic != b"LBIM":
+					footer = lbimFooterLayout.unpack_from(sf,contentSize-lbimFooterLayout.size)
+					if footer.magic != b"LBIM":
 						print_error("Bad uncached texture (invalid subfilemagic); skipping "+str(textureName))
-					else:
-						sf.seek(contentSize-0x28)
-						subfileUnknown5 = readAndParseInt(sf,4)
-						subfileUnknown4 = readAndParseInt(sf,4)
-						imgWidth = readAndParseInt(sf,4)
-						imgHeight = readAndParseInt(sf,4)
-						subfileUnknown3 = readAndParseInt(sf,4)
-						subfileUnknown2 = readAndParseInt(sf,4)
-						imgType = readAndParseInt(sf,4)
-						subfileUnknown1 = readAndParseInt(sf,4)
-						imgVersion = readAndParseInt(sf,4)
-						dc = splitTemps and textureName.startswith("temp")
-						if context.scene.monado_forge_import.keepAllResolutions or highResSubfileIndex <= 0: # if there's no highResSubfileIndex, this is the best resolution
-							sf.seek(0)
-							nameToUse = textureName
-							if differentiate:
-								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
-								nameToUse = os.path.join("res1",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(),context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
-						# it is at this point where we need the data from the highest-resolution image
-						if highResSubfileIndex > 0:
-							hdfileHeaderOffset = mainOffset+subfileHeadersOffset+highResSubfileIndex*3*4
-							hdfileName,hdfileData = extract_wismt_subfile(f,hdfileHeaderOffset)
-							nameToUse = textureName
-							if differentiate:
-								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
-								nameToUse = os.path.join("res2",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth*2,imgHeight*2,hdfileData,context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
+						continue
+					imgWidth,imgHeight = footer.imgWidth,footer.imgHeight
+					if not bigger_texture_wanted(cachedTextureSizes.get(textureName),maxTextureSize):
+						continue
+					useMidRes = texture_within_size(imgWidth,imgHeight,maxTextureSize) or textureName not in cachedTextureSizes # too big, but it's the smallest there is
+					useHighRes = highResSubfileIndex > 0 and texture_within_size(imgWidth*2,imgHeight*2,maxTextureSize)
+					if useHighRes:
+						queue_wismt_subfile(inflateQueue,highResSubfileIndex,f,mainOffset+subfileHeadersOffset+highResSubfileIndex*3*4)
+					uncachedTextures.append([textureName,sf,footer,useMidRes,useHighRes,highResSubfileIndex])
+			for textureName,sf,footer,useMidRes,useHighRes,highResSubfileIndex in uncachedTextures:
+				try: # no except, just finally (to close sf)
+					imgWidth,imgHeight,imgType,imgVersion = footer.imgWidth,footer.imgHeight,footer.imgType,footer.imgVersion
+					dc = splitTemps and textureName.startswith("temp")
+					if useMidRes and (context.scene.monado_forge_import.keepAllResolutions or not useHighRes): # if there's no (usable) high-res version, this is the best resolution
+						sf.seek(0)
+						nameToUse = textureName
+						if differentiate:
+							nameToUse = filename+"_"+nameToUse
+						if context.scene.monado_forge_import.keepAllResolutions:
+							nameToUse = os.path.join("res1",nameToUse)
+						textureQueue.add(textureName,nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(),dechannelise=dc)
+					# it is at this point where we need the data from the highest-resolution image
+					if useHighRes:
+						hdfileName,hdfileData = inflateQueue.take(highResSubfileIndex)
+						nameToUse = textureName
+						if differentiate:
+							nameToUse = filename+"_"+nameToUse
+						if context.scene.monado_forge_import.keepAllResolutions:
+							nameToUse = os.path.join("res2",nameToUse)
+						textureQueue.add(textureName,nameToUse,imgVersion,imgType,imgWidth*2,imgHeight*2,hdfileData,dechannelise=dc)
 				finally:
 					sf.close()
-		del subfileData
-		nextSubfileIndex += 1
-	# at this point, any remaining subfiles ought to be unheadered data, so ignore them
-	# now, go fetch the external textures
-	# assumption: the external .wismt files here are literally copy-pastes of the previous-game stuff
-	# as in, the Ms have the typical headers, while the Hs are headerless and double the size
-	# there's probably a way to reduce the copy-pasted code here, but the necessary differences are subtle
-	texMPath = bpy.path.abspath(context.scene.monado_forge_import.textureRepoMPath)
-	texHPath = bpy.path.abspath(context.scene.monado_forge_import.textureRepoHPath)
-	if game == "XC3" and context.scene.monado_forge_import.importUncachedTextures and not context.scene.monado_forge_import.skipMaterialImport and texMPath and texHPath:
-		for textureName in set(listOfCachedTextureNames):
-			mFilename = os.path.join(texMPath,textureName+".wismt")
-			hFilename = os.path.join(texHPath,textureName+".wismt")
-			if not os.path.exists(mFilename): continue
-			hasH = os.path.exists(hFilename)
-			with open(mFilename,"rb") as fM:
-				subfileName,subfileData = extract_wismt_subfile(fM,0,headless=True)
-				sf = io.BytesIO(subfileData)
+			del subfileData
+			nextSubfileIndex += 1
+		# at this point, any remaining subfiles ought to be unheadered data, so ignore them
+		# now, go fetch the external textures
+		# assumption: the external .wismt files here are literally copy-pastes of the previous-game stuff
+		# as in, the Ms have the typical headers, while the Hs are headerless and double the size
+		# there's probably a way to reduce the copy-pasted code here, but the necessary differences are subtle
+		texMPath = bpy.path.abspath(context.scene.monado_forge_import.textureRepoMPath)
+		texHPath = bpy.path.abspath(context.scene.monado_forge_import.textureRepoHPath)
+		if game == "XC3" and context.scene.monado_forge_import.importUncachedTextures and not context.scene.monado_forge_import.skipMaterialImport and texMPath and texHPath:
+			# all the Ms get queued up first, then each H as soon as its M says it's wanted, so they can all be inflating at once
+			externalTextures = []
+			for textureName in cachedTextureSizes.keys():
+				mFilename = os.path.join(texMPath,textureName+".wismt")
+				if not os.path.exists(mFilename): continue
+				if not bigger_texture_wanted(cachedTextureSizes[textureName],maxTextureSize): continue
+				fM = MappedFile(mFilename)
+				externalFiles.append(fM)
+				queue_wismt_subfile(inflateQueue,("M",textureName),fM,0,headless=True)
+				externalTextures.append([textureName,fM])
+			highResTextures = []
+			for textureName,fM in externalTextures:
+				hFilename = os.path.join(texHPath,textureName+".wismt")
+				try:
+					subfileName,subfileData = inflateQueue.take(("M",textureName))
+				finally:
+					fM.close()
+				sf = BufferView(subfileData)
 				try: # no except, just finally (to close sf)
-					sf.seek(len(subfileData)-0x4)
-					submagic = sf.read(4)
-					if submagic != b"LBIM":
+					footer = lbimFooterLayout.unpack_from(sf,len(subfileData)-lbimFooterLayout.size)
+					if footer.magic != b"LBIM":
 						print_error("Bad uncached texture (invalid subfilemagic); skipping "+str(textureName))
 						continue
-					sf.seek(len(subfileData)-0x28)
-					subfileUnknown5 = readAndParseInt(sf,4)
-					subfileUnknown4 = readAndParseInt(sf,4)
-					imgWidth = readAndParseInt(sf,4)
-					imgHeight = readAndParseInt(sf,4)
-					subfileUnknown3 = readAndParseInt(sf,4)
-					subfileUnknown2 = readAndParseInt(sf,4)
-					imgType = readAndParseInt(sf,4)
-					subfileUnknown1 = readAndParseInt(sf,4)
-					imgVersion = readAndParseInt(sf,4)
+					imgWidth,imgHeight,imgType,imgVersion = footer.imgWidth,footer.imgHeight,footer.imgType,footer.imgVersion
 					dc = splitTemps and textureName.startswith("temp")
+					if not texture_within_size(imgWidth,imgHeight,maxTextureSize): continue
+					hasH = texture_within_size(imgWidth*2,imgHeight*2,maxTextureSize) and os.path.exists(hFilename)
 					if context.scene.monado_forge_import.keepAllResolutions or not hasH: # if there's no hasH, this is the best resolution
 						sf.seek(0)
 						nameToUse = textureName
@@ -916,21 +884,35 @@ def import_wismt(f, wimdoResults, context):
 							nameToUse = filename+"_"+nameToUse
 						if context.scene.monado_forge_import.keepAllResolutions:
 							nameToUse = os.path.join("res1",nameToUse)
-						finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(),context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-						textureAlignment[textureName] = finalName
-					# it is at this point where we need the data from the highest-resolution image
+						textureQueue.add(textureName,nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(),dechannelise=dc)
+					# the highest-resolution image gets picked up once all the Ms are done
 					if hasH:
-						with open(hFilename,"rb") as fH:
-							hdfileName,hdfileData = extract_wismt_subfile(fH,0,headless=True)
-							nameToUse = textureName
-							if differentiate:
-								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
-								nameToUse = os.path.join("res2",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth*2,imgHeight*2,hdfileData,context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
+						fH = MappedFile(hFilename)
+						externalFiles.append(fH)
+						queue_wismt_subfile(inflateQueue,("H",textureName),fH,0,headless=True)
+						highResTextures.append([textureName,fH,imgVersion,imgType,imgWidth*2,imgHeight*2,dc])
 				finally:
 					sf.close()
+			for textureName,fH,imgVersion,imgType,imgWidth,imgHeight,dc in highResTextures:
+				try:
+					hdfileName,hdfileData = inflateQueue.take(("H",textureName))
+				finally:
+					fH.close()
+				nameToUse = textureName
+				if differentiate:
+					nameToUse = filename+"_"+nameToUse
+				if context.scene.monado_forge_import.keepAllResolutions:
+					nameToUse = os.path.join("res2",nameToUse)
+				textureQueue.add(textureName,nameToUse,imgVersion,imgType,imgWidth,imgHeight,hdfileData,dechannelise=dc)
+	
+		# textures are decoded off in other processes, so wait for the stragglers before the materials need them
+		for textureName,finalName in textureQueue.finish():
+			textureAlignment[textureName] = finalName
+	finally:
+		inflateQueue.cancel()
+		for externalFile in externalFiles: # closing twice does no harm
+			externalFile.close()
+		textureQueue.close()
 	
 	# time to ready materials
 	wimdoMaterials = wimdoResults.getMaterials()
@@ -989,7 +971,7 @@ def import_sar1_skeleton_only(self, context):
 	positionEpsilon = context.scene.monado_forge_main.positionEpsilon
 	angleEpsilon = context.scene.monado_forge_main.angleEpsilon
 	
-	with open(absolutePath, "rb") as f:
+	with MappedFile(absolutePath) as f:
 		skeleton = import_sar1_skel_subfile(f, context)
 	
 	# we now have the skeleton in generic format - create the armature
@@ -1016,7 +998,7 @@ def import_wimdo_only(self, context):
 		self.report({"ERROR"}, "File was not a .wimdo file")
 		return {"CANCELLED"}
 	
-	with open(absoluteDefsPath, "rb") as f:
+	with MappedFile(absoluteDefsPath) as f:
 		forgeResults = import_wimdo(f, context)
 	return realise_results(forgeResults, os.path.splitext(os.path.basename(absoluteDefsPath))[0], self, context)
 
@@ -1033,9 +1015,9 @@ def import_wimdo_and_wismt(self, context):
 		self.report({"ERROR"}, "Second file was not a .wismt file")
 		return {"CANCELLED"}
 	
-	with open(absoluteDefsPath, "rb") as f:
+	with MappedFile(absoluteDefsPath) as f:
 		wimdoResults = import_wimdo(f, context)
-	with open(absoluteDataPath, "rb") as f:
+	with MappedFile(absoluteDataPath) as f:
 		wismtResults = import_wismt(f, wimdoResults, context)
 	return realise_results(wismtResults, os.path.splitext(os.path.basename(absoluteDataPath))[0], self, context)
 
@@ -1056,11 +1038,11 @@ def import_sar1_skel_and_wimdo_and_wismt(self, context):
 	
 	# we can't actually use the .arc/.chr in the .wimdo/.wismt importing (since everything's based on the indices of the internal bones)
 	# thus, we just do a merge into it after the fact
-	with open(absoluteSkelPath, "rb") as f:
+	with MappedFile(absoluteSkelPath) as f:
 		skelResult = import_sar1_skel_subfile(f, context)
-	with open(absoluteDefsPath, "rb") as f:
+	with MappedFile(absoluteDefsPath) as f:
 		wimdoResults = import_wimdo(f, context, externalSkeleton=skelResult)
-	with open(absoluteDataPath, "rb") as f:
+	with MappedFile(absoluteDataPath) as f:
 		wismtResults = import_wismt(f, wimdoResults, context)
 	return realise_results(wismtResults, os.path.splitext(os.path.basename(absoluteDataPath))[0], self, context)
 
@@ -350,14 +350,58 @@ class MonadoForgeViewImportProperties(PropertyGroup):
 	)
 	splitTemps : BoolProperty(
 		name="Dechannelise \"temp\" Files",
-		description="(warning: slow, thinking of a better way to implement the feature)\nIf the image is named \"temp0000\" or similar, splits it out into an independent file per channel",
-		default=False,
+		description="If the image is named \"temp0000\" or similar, splits it out into an independent file per channel",
+		default=True,
 	)
 	keepAllResolutions : BoolProperty(
 		name="Keep All Resolutions",
 		description="Include all textures, even if there's a larger resolution of the same",
 		default=False,
 	)
+	maxTextureSize : IntProperty(
+		name="Max Texture Size",
+		description="Only import the biggest version of each texture that fits within this size (0: no limit). Bigger versions aren't even unpacked, so this speeds things up a lot if full resolution isn't needed (the smallest version is still used if none fit)",
+		default=0,
+		min=0,
+		soft_max=4096,
+	)
+	textureDecodeWorkers : IntProperty(
+		name="Decoding Processes",
+		description="How many separate processes to decode textures with (0: one per CPU core; 1: decode inside Blender, no extra processes)",
+		default=0,
+		min=0,
+		soft_max=32,
+	)
+	keepTexturesCompressed : BoolProperty(
+		name="Save As DDS",
+		description="Save textures as still-compressed .dds files instead of decoding them to .png (much faster and uses less VRAM, but BC5 normals don't get a blue channel and \"temp\" files aren't dechannelised; BC7 textures still get decoded; needs Auto-Save Textures)",
+		default=False,
+	)
+	pngCompression : IntProperty(
+		name="PNG Compression",
+		description="How hard to compress auto-saved .png textures (0: not at all, fastest; 9: smallest files, slowest)",
+		default=1,
+		min=0,
+		max=9,
+	)
+	useTextureCache : BoolProperty(
+		name="Cache Decoded Textures",
+		description="Keep decoded textures on disk, so importing the same ones again skips the decoding",
+		default=False,
+	)
+	textureCachePath : StringProperty(
+		name="Cache Path",
+		description="Folder to keep decoded textures in (blank: use the system's temp folder)",
+		default="",
+		maxlen=1024,
+		subtype="DIR_PATH",
+	)
+	textureCacheSize : IntProperty(
+		name="Cache Size (MB)",
+		description="Once the cache gets bigger than this, the least recently used textures are removed from it",
+		default=1024,
+		min=0,
+	)
 	def nodeLibraryCallback(self, context):
 		return (
 			("BasicMetallic","Basic Metallic Shader","Metallic-style PBR shader with inputs tailored for the average Xenoblade model"),
@@ -467,6 +511,18 @@ class OBJECT_PT_MonadoForgeViewImportTextureOptionsPanel(Panel):
 		col.prop(scn.monado_forge_import, "blueBC5")
 		col.prop(scn.monado_forge_import, "splitTemps")
 		col.prop(scn.monado_forge_import, "keepAllResolutions")
+		col.prop(scn.monado_forge_import, "maxTextureSize")
+		col.prop(scn.monado_forge_import, "keepTexturesCompressed")
+		pngCompressionRow = col.row()
+		pngCompressionRow.prop(scn.monado_forge_import, "pngCompression")
+		pngCompressionRow.enabled = not scn.monado_forge_import.keepTexturesCompressed
+		col.prop(scn.monado_forge_import, "textureDecodeWorkers")
+		col.prop(scn.monado_forge_import, "useTextureCache")
+		textureCacheGroup = col.column(align=True)
+		textureCacheGroup.prop(scn.monado_forge_import, "textureCachePath", text="...in")
+		textureCacheGroup.prop(scn.monado_forge_import, "textureCacheSize")
+		textureCacheGroup.label(text="Hits: "+str(textureCacheStats["hits"])+", misses: "+str(textureCacheStats["misses"]))
+		textureCacheGroup.enabled = scn.monado_forge_import.useTextureCache
 
 class OBJECT_PT_MonadoForgeViewImportCleanupPanel(Panel):
 	bl_idname = "OBJECT_PT_MonadoForgeViewImportCleanupPanel"
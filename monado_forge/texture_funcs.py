@@ -0,0 +1,646 @@
+import collections
+import hashlib
+import numpy
+import os
+import struct
+import tempfile
+import zlib
+from multiprocessing import shared_memory
+
+# whole-texture block decoding
+# nothing in here touches bpy, so it can all be run outside of Blender too
+# the decoders take an (N,blockBytes) uint8 array of blocks that are already in linear (deswizzled) order,
+# and give back an (N,4,4,4) uint8 array of [block,row,column,rgba] with rows in file order (top to bottom)
+# (R8G8B8A8 "blocks" are single pixels, so that one gives (N,1,1,4))
+# everything stays as uint8 until it's handed to Blender, which is a quarter the memory of even float32
+# Blender keeps non-float images as bytes anyway, so this loses nothing: in-between values are rounded the same way Blender would have rounded them
+# (results are byte-for-byte the same images the old one-block-at-a-time float code made)
+
+# https://learn.microsoft.com/en-us/windows/win32/api/dxgiformat/ne-dxgiformat-dxgi_format
+# uses the "raw" values taken from the code rather than the ones in the MS enum (we aren't calling any MS code so we don't need it)
+# only contains things we know of (rather than future-proofing with extra entries) since how're we supposed to guess what the raw numbers equate to
+# (it's pretty obvious that 67 = BC2 and 76 = BC6, but those formats are rare anyway)
+# [formatName, bitsPerPixel]
+# possible additions: 1:R8Unorm, 41:R16G16B16A16Float, 109:B8G8R8A8Unorm, https://github.com/PredatorCZ/XenoLib/blob/master/include/xenolib/lbim.hpp
+imageFormats = {
+				37:["R8G8B8A8_UNORM",32],
+				66:["BC1_UNORM",4], # aka DXT1
+				68:["BC3_UNORM",8], # aka DXT5
+				73:["BC4_UNORM",4],
+				75:["BC5_UNORM",8],
+				77:["BC7_UNORM",8],
+				}
+
+# https://learn.microsoft.com/en-us/windows/win32/direct3ddds/dds-pixelformat
+# the old-style (pre-DX10) pixel formats, for writing .dds files that older readers (Blender's included) can actually load
+# there's no old-style way to say BC7, so that one can't be kept compressed
+# [flags, FourCC, bitsPerPixel, R mask, G mask, B mask, A mask]
+ddsPixelFormats = {
+				"R8G8B8A8_UNORM":[0x41,b"\0\0\0\0",32,0x000000FF,0x0000FF00,0x00FF0000,0xFF000000], # RGB + alpha, given as masks
+				"BC1_UNORM":[0x4,b"DXT1",0,0,0,0,0], # FourCC
+				"BC3_UNORM":[0x4,b"DXT5",0,0,0,0,0],
+				"BC4_UNORM":[0x4,b"ATI1",0,0,0,0,0],
+				"BC5_UNORM":[0x4,b"ATI2",0,0,0,0,0],
+				}
+
+# BC7 needs a *lot* of external junk
+# https://registry.khronos.org/DataFormat/specs/1.3/dataformat.1.3.html#bptc_bc7
+# https://github.com/python-pillow/Pillow/blob/main/src/libImaging/BcnDecode.c
+# [subsetCount, partitionBits, rotationBits, indexSelectionBits, colourBits, alphaBits, endpointPBits, sharedPBits, indexBits, index2Bits]
+bc7ModeData = {
+				0:[3, 4, 0, 0, 4, 0, 1, 0, 3, 0],
+				1:[2, 6, 0, 0, 6, 0, 0, 1, 3, 0],
+				2:[3, 6, 0, 0, 5, 0, 0, 0, 2, 0],
+				3:[2, 6, 0, 0, 7, 0, 1, 0, 2, 0],
+				4:[1, 0, 2, 1, 5, 6, 0, 0, 2, 3],
+				5:[1, 0, 2, 0, 7, 8, 0, 0, 2, 2],
+				6:[1, 0, 0, 0, 7, 7, 1, 0, 4, 0],
+				7:[2, 6, 0, 0, 5, 5, 1, 0, 2, 0],
+				}
+bc7Weights = {
+				2:[0, 21, 43, 64],
+				3:[0, 9, 18, 27, 37, 46, 55, 64],
+				4:[0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64],
+				}
+# bitmaps of which subsets each pixel uses, [row,column] order
+bc7PartitionMaps = {
+					2:[
+						0xcccc, 0x8888, 0xeeee, 0xecc8, 0xc880, 0xfeec, 0xfec8, 0xec80,
+						0xc800, 0xffec, 0xfe80, 0xe800, 0xffe8, 0xff00, 0xfff0, 0xf000,
+						0xf710, 0x008e, 0x7100, 0x08ce, 0x008c, 0x7310, 0x3100, 0x8cce,
+						0x088c, 0x3110, 0x6666, 0x366c, 0x17e8, 0x0ff0, 0x718e, 0x399c,
+						0xaaaa, 0xf0f0, 0x5a5a, 0x33cc, 0x3c3c, 0x55aa, 0x9696, 0xa55a,
+						0x73ce, 0x13c8, 0x324c, 0x3bdc, 0x6996, 0xc33c, 0x9966, 0x0660,
+						0x0272, 0x04e4, 0x4e40, 0x2720, 0xc936, 0x936c, 0x39c6, 0x639c,
+						0x9336, 0x9cc6, 0x817e, 0xe718, 0xccf0, 0x0fcc, 0x7744, 0xee22,
+						],
+					3:[
+						0xaa685050, 0x6a5a5040, 0x5a5a4200, 0x5450a0a8, 0xa5a50000, 0xa0a05050, 0x5555a0a0, 0x5a5a5050,
+						0xaa550000, 0xaa555500, 0xaaaa5500, 0x90909090, 0x94949494, 0xa4a4a4a4, 0xa9a59450, 0x2a0a4250,
+						0xa5945040, 0x0a425054, 0xa5a5a500, 0x55a0a0a0, 0xa8a85454, 0x6a6a4040, 0xa4a45000, 0x1a1a0500,
+						0x0050a4a4, 0xaaa59090, 0x14696914, 0x69691400, 0xa08585a0, 0xaa821414, 0x50a4a450, 0x6a5a0200,
+						0xa9a58000, 0x5090a0a8, 0xa8a09050, 0x24242424, 0x00aa5500, 0x24924924, 0x24499224, 0x50a50a50,
+						0x500aa550, 0xaaaa4444, 0x66660000, 0xa5a0a5a0, 0x50a050a0, 0x69286928, 0x44aaaa44, 0x66666600,
+						0xaa444444, 0x54a854a8, 0x95809580, 0x96969600, 0xa85454a8, 0x80959580, 0xaa141414, 0x96960000,
+						0xaaaa1414, 0xa05050a0, 0xa0a5a5a0, 0x96000000, 0x40804080, 0xa9a8a9a8, 0xaaaaaa44, 0x2a4a5254,
+						],
+					}
+# one index per subset is stored wlith one fewer bit because it is known to be 0 - this is the list of such indexes
+bc7AnchorIndexes = {
+					"1/1":[0]*64,
+					"1/2":[0]*64,
+					"2/2":[
+							15, 15, 15, 15, 15, 15, 15, 15,
+							15, 15, 15, 15, 15, 15, 15, 15,
+							15, 2, 8, 2, 2, 8, 8, 15,
+							2, 8, 2, 2, 8, 8, 2, 2,
+							15, 15, 6, 8, 2, 8, 15, 15,
+							2, 8, 2, 2, 2, 15, 15, 6,
+							6, 2, 6, 8, 15, 15, 2, 2,
+							15, 15, 15, 15, 15, 2, 2, 15
+							],
+					"1/3":[0]*64,
+					"2/3":[
+							3, 3, 15, 15, 8, 3, 15, 15,
+							8, 8, 6, 6, 6, 5, 3, 3,
+							3, 3, 8, 15, 3, 3, 6, 10,
+							5, 8, 8, 6, 8, 5, 15, 15,
+							8, 15, 3, 5, 6, 10, 8, 15,
+							15, 3, 15, 5, 15, 15, 15, 15,
+							3, 15, 5, 5, 5, 8, 5, 10,
+							5, 10, 8, 13, 15, 12, 3, 3
+							],
+					"3/3":[
+							15, 8, 8, 3, 15, 15, 3, 8,
+							15, 15, 15, 15, 15, 15, 15, 8,
+							15, 8, 15, 3, 15, 8, 15, 8,
+							3, 15, 6, 10, 15, 15, 10, 8,
+							15, 3, 15, 10, 10, 8, 9, 10,
+							6, 15, 8, 15, 3, 6, 6, 8,
+							15, 3, 15, 15, 15, 15, 15, 15,
+							15, 15, 15, 15, 3, 15, 15, 8
+							],
+					}
+
+# formats in here get decoded all at once by decode_blocks, anything else falls back to the per-block loop in parse_texture
+# (taking a format out of the list is an easy way to compare against the old decoder if something looks off)
+bulkDecodeFormats = {
+					"R8G8B8A8_UNORM",
+					"BC1_UNORM",
+					"BC3_UNORM",
+					"BC4_UNORM",
+					"BC5_UNORM",
+					"BC7_UNORM",
+					}
+
+# block-linear deswizzling, as used by the Switch (Tegra X1)
+# https://github.com/ScanMountGoat/tegra_swizzle
+# the data is made of GOBs ("groups of bytes", 64 bytes wide and 8 rows tall, stored as 512 contiguous bytes)
+# GOBs are stacked blockHeight tall into columns, and the columns go left to right, then top to bottom
+# rows are padded out to a whole number of GOBs, which is what makes non-power-of-two sizes work
+# permutations are kept for later textures of the same shape, but only so many (a 4K texture's is 8MB)
+swizzleMapCache = collections.OrderedDict()
+swizzleMapCacheSize = 32
+
+# how many GOBs tall a block is, picked from the height (in blocks) of the top mip
+def tegra_block_height(blockCountY):
+	heightAndHalf = blockCountY + blockCountY // 2
+	for gobs in [16,8,4,2]:
+		if heightAndHalf >= gobs*8:
+			return gobs
+	return 1
+
+# for every block of the image (in linear order, top row first), the index of the swizzled block it comes from
+def get_swizzle_map(blockCountX,blockCountY,bytesPerBlock):
+	key = (blockCountX,blockCountY,bytesPerBlock)
+	try:
+		swizzleMapCache.move_to_end(key)
+		return swizzleMapCache[key]
+	except KeyError:
+		pass
+	blockHeight = tegra_block_height(blockCountY)
+	widthInGobs = -(blockCountX*bytesPerBlock // -64)
+	x = numpy.arange(blockCountX,dtype=numpy.int64)[None,:]*bytesPerBlock # in bytes
+	y = numpy.arange(blockCountY,dtype=numpy.int64)[:,None]
+	gobAddress = ((y // (8*blockHeight))*512*blockHeight*widthInGobs
+				+ (x // 64)*512*blockHeight
+				+ ((y % (8*blockHeight)) // 8)*512)
+	gobOffset = ((x % 64) // 32)*256 + ((y % 8) // 2)*64 + ((x % 32) // 16)*32 + (y % 2)*16 + (x % 16)
+	swizzleMap = ((gobAddress+gobOffset) // bytesPerBlock).ravel()
+	swizzleMap.flags.writeable = False # shared between textures, so nobody gets to edit it
+	swizzleMapCache[key] = swizzleMap
+	while len(swizzleMapCache) > swizzleMapCacheSize:
+		swizzleMapCache.popitem(last=False)
+	return swizzleMap
+
+# turns the raw (swizzled) data into a block array in output order
+# sourceIndexes is the block each output block should be read from (can be just part of the swizzle map, to only fetch some of the blocks)
+def gather_blocks(rawData,sourceIndexes,blockBytes):
+	raw = numpy.frombuffer(rawData,dtype=numpy.uint8)
+	blockTable = raw[:len(raw)//blockBytes*blockBytes].reshape(-1,blockBytes)
+	if len(sourceIndexes) == 0 or int(sourceIndexes.max()) < len(blockTable):
+		return blockTable[sourceIndexes]
+	# shouldn't happen for good files, but anything past the end of the data is blank rather than a crash
+	blocks = numpy.zeros([len(sourceIndexes),blockBytes],dtype=numpy.uint8)
+	present = sourceIndexes < len(blockTable)
+	blocks[present] = blockTable[sourceIndexes[present]]
+	partial = len(raw)-len(blockTable)*blockBytes # a last block that's only partly there
+	if partial > 0:
+		blocks[sourceIndexes == len(blockTable),0:partial] = raw[len(blockTable)*blockBytes:]
+	return blocks
+
+# (N,bh,bw,C) blocks -> (H,W,C) image, flipped vertically since Blender wants the bottom row first
+def assemble_blocks(decoded,blockCountX,blockCountY):
+	blockCount,blockHeight,blockWidth,channels = decoded.shape
+	image = decoded.reshape(blockCountY,blockCountX,blockHeight,blockWidth,channels).transpose(0,2,1,3,4)
+	return image.reshape(blockCountY*blockHeight,blockCountX*blockWidth,channels)[::-1]
+
+# how Blender turns a 0.0-1.0 float into a byte, for the few things that can't be done with whole numbers
+def float_to_uint8(values):
+	values = numpy.asarray(values,dtype=numpy.float32)
+	return numpy.clip(numpy.floor(values*numpy.float32(255)+numpy.float32(0.5)),0,255).astype(numpy.uint8)
+
+# numerator/denominator to the nearest whole number (halves round up, same as float_to_uint8)
+def _rounded_div(numerator,denominator):
+	return (2*numerator+denominator) // (2*denominator)
+
+def decode_rgba_blocks(blocks):
+	return blocks.reshape(len(blocks),1,1,4)
+
+# per-pixel 2-bit indexes from the four row bytes, as [block,row,column]
+def _bc1_indexes(rowBytes):
+	return (rowBytes[:,:,None] >> numpy.array([0,2,4,6],dtype=numpy.uint8)) & 0b11
+
+# fourColourOnly is for BC3 and friends, which never use the punch-through alpha mode
+def decode_bc1_blocks(blocks,fourColourOnly=False):
+	blockCount = len(blocks)
+	words = blocks.view("<u2") # [endpoint0, endpoint1, (row0,row1), (row2,row3)]
+	endpoint0 = words[:,0].astype(numpy.int32)
+	endpoint1 = words[:,1].astype(numpy.int32)
+	# [block,endpoint,rgb] as 5/6/5-bit values, and what each one's maximum is
+	raw = numpy.empty([blockCount,2,3],dtype=numpy.int32)
+	for i,e in enumerate([endpoint0,endpoint1]):
+		raw[:,i,0] = (e & 0b1111100000000000) >> 11
+		raw[:,i,1] = (e & 0b0000011111100000) >> 5
+		raw[:,i,2] = e & 0b0000000000011111
+	maxes = numpy.array([0b11111,0b111111,0b11111],dtype=numpy.int32)
+	c0 = raw[:,0]
+	c1 = raw[:,1]
+	if fourColourOnly:
+		fourColour = numpy.ones(blockCount,dtype=bool)
+	else:
+		fourColour = endpoint0 > endpoint1
+	fc = fourColour[:,None]
+	colours = numpy.empty([blockCount,4,4],dtype=numpy.uint8)
+	colours[:,0,0:3] = _rounded_div(c0*255,maxes)
+	colours[:,1,0:3] = _rounded_div(c1*255,maxes)
+	colours[:,2,0:3] = numpy.where(fc,_rounded_div((2*c0+c1)*255,3*maxes),_rounded_div((c0+c1)*255,2*maxes))
+	colours[:,3,0:3] = numpy.where(fc,_rounded_div((c0+2*c1)*255,3*maxes),0)
+	colours[:,0:3,3] = 255
+	colours[:,3,3] = numpy.where(fourColour,255,0) # binary alpha
+	indexes = _bc1_indexes(blocks[:,4:8])
+	return colours[numpy.arange(blockCount)[:,None,None],indexes]
+
+# the 8-byte interpolated single-channel half shared by BC3 (alpha) and BC4/BC5
+# gives (N,4,4) uint8 values, or the unrounded ones as floats (0-255 range) if exact is set, for callers that need to do more maths on them
+def decode_interpolated_channel(blocks,exact=False):
+	blockCount = len(blocks)
+	v0 = blocks[:,0].astype(numpy.int32)
+	v1 = blocks[:,1].astype(numpy.int32)
+	# the in-between palette entries aren't whole numbers, so they're kept as numerator/denominator
+	numerators = numpy.empty([blockCount,8],dtype=numpy.int32)
+	denominators = numpy.ones([blockCount,8],dtype=numpy.int32)
+	numerators[:,0] = v0
+	numerators[:,1] = v1
+	eightValue = (v0 > v1)[:,None]
+	steps = numpy.arange(6)
+	sixValues = (6-steps)*v0[:,None]+(steps+1)*v1[:,None]
+	fourValues = numpy.concatenate([(4-steps[0:4])*v0[:,None]+(steps[0:4]+1)*v1[:,None],numpy.tile([0,255],[blockCount,1])],axis=1)
+	numerators[:,2:8] = numpy.where(eightValue,sixValues,fourValues)
+	denominators[:,2:8] = numpy.where(eightValue,7,[5,5,5,5,1,1])
+	# the six index bytes are one little-endian 48-bit word of 3-bit indexes, in file pixel order
+	indexBits = numpy.zeros(blockCount,dtype=numpy.uint64)
+	for i in range(6):
+		indexBits |= blocks[:,2+i].astype(numpy.uint64) << numpy.uint64(8*i)
+	indexes = ((indexBits[:,None] >> (numpy.arange(16,dtype=numpy.uint64)*numpy.uint64(3))) & numpy.uint64(0b111)).astype(numpy.intp)
+	numerators = numpy.take_along_axis(numerators,indexes,axis=1).reshape(blockCount,4,4)
+	denominators = numpy.take_along_axis(denominators,indexes,axis=1).reshape(blockCount,4,4)
+	if exact:
+		return numerators/denominators
+	return _rounded_div(numerators,denominators).astype(numpy.uint8)
+
+def decode_bc3_blocks(blocks):
+	pixels = decode_bc1_blocks(numpy.ascontiguousarray(blocks[:,8:16]),fourColourOnly=True)
+	pixels[:,:,:,3] = decode_interpolated_channel(blocks[:,0:8])
+	return pixels
+
+def decode_bc4_blocks(blocks):
+	values = decode_interpolated_channel(blocks)
+	pixels = numpy.full([len(blocks),4,4,4],255,dtype=numpy.uint8)
+	pixels[:,:,:,0] = values
+	pixels[:,:,:,1] = values
+	pixels[:,:,:,2] = values
+	return pixels
+
+# blueBC5 calculates the blue channel for normal mapping (length of [r,g,b] is 1.0)
+# interpolated palette entries aren't whole numbers, so a 256x256 table can't cover them - it's done as array maths instead
+def decode_bc5_blocks(blocks,blueBC5=False):
+	pixels = numpy.full([len(blocks),4,4,4],255,dtype=numpy.uint8)
+	pixels[:,:,:,0] = decode_interpolated_channel(blocks[:,0:8])
+	pixels[:,:,:,1] = decode_interpolated_channel(blocks[:,8:16])
+	if blueBC5:
+		# the blue channel is worked out from the unrounded red and green
+		r = (decode_interpolated_channel(blocks[:,0:8],exact=True)-128)/128.0
+		g = (decode_interpolated_channel(blocks[:,8:16],exact=True)-128)/128.0
+		remainder = 1-r**2-g**2
+		valid = remainder >= 0 # r**2+g**2 > 1 would be the sqrt of a negative, so those get flat 0.5
+		pixels[:,:,:,2] = float_to_uint8(numpy.where(valid,numpy.sqrt(numpy.where(valid,remainder,0))/2+0.5,0.5))
+	else:
+		pixels[:,:,:,2] = 0
+	return pixels
+
+# the BC7 tables above, expanded into arrays once so every block of a mode can be looked up together
+def _build_bc7_tables():
+	# [subsetCount] -> (64,16) which subset each pixel uses, per partition pattern (pixels in file order)
+	partitionTable = {1:numpy.zeros([64,16],dtype=numpy.intp)}
+	partitionTable[2] = (numpy.array(bc7PartitionMaps[2],dtype=numpy.int64)[:,None] >> numpy.arange(16)) & 0b1
+	partitionTable[3] = (numpy.array(bc7PartitionMaps[3],dtype=numpy.int64)[:,None] >> (numpy.arange(16)*2)) & 0b11
+	# [subsetCount] -> (64,16) whether each pixel is the anchor of its subset (and so is stored with one fewer bit)
+	anchorTable = {}
+	for subsetCount in [1,2,3]:
+		partitionTable[subsetCount] = partitionTable[subsetCount].astype(numpy.intp)
+		anchors = numpy.array([bc7AnchorIndexes[str(s+1)+"/"+str(subsetCount)] for s in range(subsetCount)]).T
+		anchorTable[subsetCount] = numpy.take_along_axis(anchors,partitionTable[subsetCount],axis=1) == numpy.arange(16)
+	weightTable = {bits:numpy.array(w,dtype=numpy.int64) for bits,w in bc7Weights.items()}
+	return partitionTable,anchorTable,weightTable
+bc7PartitionTable,bc7AnchorTable,bc7WeightTable = _build_bc7_tables()
+
+# reads the same fields as BitReader(reverse=True) does, but for a whole array of blocks at once
+# each block is a 128-bit little-endian integer, held as a low and a high uint64
+class BC7FieldReader():
+	def __init__(self,lo,hi,start):
+		self.lo = lo
+		self.hi = hi
+		self.pointer = start
+	# the 64 bits starting at the given bit, for every block (bits past the end of the block come out as 0)
+	def _window(self,start):
+		if start == 0:
+			return self.lo
+		if start >= 64:
+			return self.hi >> numpy.uint64(start-64)
+		return (self.lo >> numpy.uint64(start)) | (self.hi << numpy.uint64(64-start))
+	def readbits(self,n):
+		if n == 0: # unlike BitReader, give 0s rather than None, since the callers want arrays either way
+			return numpy.zeros(len(self.lo),dtype=numpy.int64)
+		v = self._window(self.pointer) & numpy.uint64((1 << n)-1)
+		self.pointer += n
+		return v.astype(numpy.int64)
+	# all 16 indexes of one set, where the anchor pixels are one bit shorter
+	def readindexes(self,n,isAnchor):
+		sizes = n - isAnchor.astype(numpy.int64)
+		offsets = numpy.cumsum(sizes,axis=1) - sizes
+		window = self._window(self.pointer)[:,None]
+		v = (window >> offsets.astype(numpy.uint64)) & ((numpy.uint64(1) << sizes.astype(numpy.uint64)) - numpy.uint64(1))
+		self.pointer += n*16 - int(isAnchor[0].sum()) if len(isAnchor) > 0 else 0
+		return v.astype(numpy.intp)
+
+# all blocks here must be of the same mode; gives (N,16,4) in file pixel order
+def _decode_bc7_mode(mode,lo,hi):
+	subsetCount,partitionBits,rotationBits,indexSelectionBits,colourBits,alphaBits,endpointPBits,sharedPBits,indexBits,index2Bits = bc7ModeData[mode]
+	blockCount = len(lo)
+	bits = BC7FieldReader(lo,hi,mode+1) # the mode itself is one 1 bit after "mode" 0 bits
+	partitionPattern = bits.readbits(partitionBits)
+	rotationPattern = bits.readbits(rotationBits)
+	indexSelectionPattern = bits.readbits(indexSelectionBits)
+	# [block,channel,subset,endpoint], read in the same order as the file stores them
+	endpoints = numpy.zeros([blockCount,4,subsetCount,2],dtype=numpy.int64)
+	for c,channelBits in enumerate([colourBits,colourBits,colourBits,alphaBits]):
+		for s in range(subsetCount):
+			for ep in [0,1]:
+				endpoints[:,c,s,ep] = bits.readbits(channelBits)
+	endpointsP = numpy.zeros([blockCount,subsetCount,2],dtype=numpy.int64)
+	for s in range(subsetCount):
+		for ep in [0,1]:
+			endpointsP[:,s,ep] = bits.readbits(endpointPBits)
+	subsetsP = numpy.zeros([blockCount,subsetCount,1],dtype=numpy.int64)
+	for s in range(subsetCount):
+		subsetsP[:,s,0] = bits.readbits(sharedPBits)
+	partitionMap = bc7PartitionTable[subsetCount][partitionPattern]
+	isAnchor = bc7AnchorTable[subsetCount][partitionPattern]
+	indexes1 = bits.readindexes(indexBits,isAnchor)
+	if index2Bits > 0:
+		indexes2 = bits.readindexes(index2Bits,isAnchor)
+	# endpoint expansion to 8 bits
+	for c,channelBits in enumerate([colourBits,colourBits,colourBits,alphaBits]):
+		if channelBits == 0: # no alpha in this mode
+			endpoints[:,c] = 255
+			continue
+		e = endpoints[:,c]
+		if endpointPBits > 0:
+			e = (e << 1) | endpointsP
+		if sharedPBits > 0:
+			e = (e << 1) | subsetsP
+		cb = channelBits+endpointPBits+sharedPBits
+		endpoints[:,c] = (e << (8 - cb)) | ((e << (8 - cb)) >> cb)
+	# per-pixel weights (as opposed to per-subset palettes, since mode 4 changes its index sizes block by block)
+	if index2Bits > 0:
+		selected = indexSelectionPattern.astype(bool)[:,None] # reminder: this swaps which set is colour and which is alpha
+		colourWeights = numpy.where(selected,bc7WeightTable[index2Bits][indexes2],bc7WeightTable[indexBits][indexes1])
+		alphaWeights = numpy.where(selected,bc7WeightTable[indexBits][indexes1],bc7WeightTable[index2Bits][indexes2])
+	else:
+		colourWeights = bc7WeightTable[indexBits][indexes1]
+		alphaWeights = None
+	channels = []
+	for c in range(4):
+		if c == 3 and alphaWeights is None:
+			# only modes with a separate alpha index set get alpha - kept as it always was, even for modes 6 and 7
+			channels.append(numpy.full([blockCount,16],255,dtype=numpy.int64))
+			continue
+		w = colourWeights if c < 3 else alphaWeights
+		e0 = numpy.take_along_axis(endpoints[:,c,:,0],partitionMap,axis=1)
+		e1 = numpy.take_along_axis(endpoints[:,c,:,1],partitionMap,axis=1)
+		channels.append(((64-w)*e0+w*e1+32) >> 6)
+	r,g,b,a = channels
+	if rotationBits > 0:
+		rotation = rotationPattern[:,None]
+		r,a = numpy.where(rotation == 1,a,r),numpy.where(rotation == 1,r,a)
+		g,a = numpy.where(rotation == 2,a,g),numpy.where(rotation == 2,g,a)
+		b,a = numpy.where(rotation == 3,a,b),numpy.where(rotation == 3,b,a)
+	return numpy.stack([r,g,b,a],axis=-1).astype(numpy.uint8)
+
+def decode_bc7_blocks(blocks):
+	blockCount = len(blocks)
+	pixels = numpy.zeros([blockCount,16,4],dtype=numpy.uint8) # reserved mode 8 stays as transparent black
+	halves = blocks.view("<u8")
+	modeByte = blocks[:,0]
+	# the mode is the number of 0 bits before the first 1 bit (lowest first); no 1 bit at all is mode 8
+	modes = numpy.full(blockCount,8)
+	for mode in range(7,-1,-1):
+		modes[(modeByte >> mode) & 1 == 1] = mode
+	for mode in range(8):
+		members = numpy.nonzero(modes == mode)[0]
+		if len(members) == 0: continue
+		pixels[members] = _decode_bc7_mode(mode,halves[members,0],halves[members,1])
+	return pixels.reshape(blockCount,4,4,4)
+
+def count_bc7_reserved_blocks(blocks):
+	return int(numpy.count_nonzero(blocks[:,0] == 0))
+
+def decode_blocks(imgFormat,blocks,blueBC5=False):
+	if imgFormat == "R8G8B8A8_UNORM":
+		return decode_rgba_blocks(blocks)
+	if imgFormat == "BC1_UNORM":
+		return decode_bc1_blocks(blocks)
+	if imgFormat == "BC3_UNORM":
+		return decode_bc3_blocks(blocks)
+	if imgFormat == "BC4_UNORM":
+		return decode_bc4_blocks(blocks)
+	if imgFormat == "BC5_UNORM":
+		return decode_bc5_blocks(blocks,blueBC5)
+	if imgFormat == "BC7_UNORM":
+		return decode_bc7_blocks(blocks)
+	raise ValueError("no bulk decoder for "+imgFormat)
+
+# [imgFormat, blockSize (in pixels), bytes per block, virtual width, virtual height]
+# since the minimum block size is 4, images must be divisible by 4 - the virtual size is the image extended as necessary
+def get_texture_layout(imgType,imgWidth,imgHeight):
+	imgFormat,bitsPerPixel = imageFormats[imgType]
+	blockSize = 4 # in pixels
+	blockBytes = bitsPerPixel*2
+	if imgFormat == "R8G8B8A8_UNORM": # blocks are single pixels rather than 4x4
+		blockSize = 1
+		blockBytes = bitsPerPixel // 8
+	virtImgWidth = -(imgWidth // -blockSize)*blockSize
+	virtImgHeight = -(imgHeight // -blockSize)*blockSize
+	return [imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight]
+
+# just the deswizzled top mip, still compressed (top row first, as .dds wants)
+def deswizzle_texture(imgType,imgWidth,imgHeight,rawData):
+	imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
+	sourceIndexes = get_swizzle_map(virtImgWidth // blockSize,virtImgHeight // blockSize,blockBytes)
+	warnings = []
+	if len(rawData) < (int(sourceIndexes.max())+1)*blockBytes:
+		warnings.append("has less data than its size needs ("+str(len(rawData))+" bytes); the rest will be blank")
+	return gather_blocks(rawData,sourceIndexes,blockBytes).tobytes(),warnings
+
+def dds_can_keep(imgType):
+	return imgType in imageFormats and imageFormats[imgType][0] in ddsPixelFormats
+
+# https://learn.microsoft.com/en-us/windows/win32/direct3ddds/dds-header
+# no DX10 extension, so only the formats in ddsPixelFormats can be written
+ddsHeaderStruct = struct.Struct("<4s7L44x2L4s5L4L4x")
+def build_dds_header(imgType,imgWidth,imgHeight):
+	imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
+	flags = 0x1 | 0x2 | 0x4 | 0x1000 # caps, height, width, pixel format
+	if blockSize == 1: # uncompressed, so give the pitch (bytes per row)
+		flags |= 0x8
+		pitchOrLinearSize = imgWidth*blockBytes
+	else: # compressed, so give the size of the whole thing
+		flags |= 0x80000
+		pitchOrLinearSize = (virtImgWidth // blockSize)*(virtImgHeight // blockSize)*blockBytes
+	return ddsHeaderStruct.pack(b"DDS ",124,flags,imgHeight,imgWidth,pitchOrLinearSize,0,1,
+								32,*ddsPixelFormats[imgFormat], # pixel format
+								0x1000,0,0,0) # caps: "is a texture"
+
+# textures are decoded a strip of block rows at a time, since the decoders' working arrays are many times the size of their output
+# (BC7 in one go would need over a gigabyte for a 4K texture; this way it's a few tens of MB no matter the size)
+# the swizzle map says exactly which blocks each strip needs, so only those get fetched
+decodeStripBlocks = 16384
+
+# decodes a whole texture into an (H,W,4) array (virtual size, bottom row first, as Blender wants)
+# only for bulkDecodeFormats; also gives back a list of warnings (things that are odd about the texture but not fatal)
+# swizzled=False is for data that's already in linear order (nothing in the games, but handy for comparisons)
+def decode_texture(imgType,imgWidth,imgHeight,rawData,blueBC5=False,out=None,swizzled=True):
+	imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
+	blockCountX = virtImgWidth // blockSize
+	blockCountY = virtImgHeight // blockSize
+	if out is None:
+		out = numpy.zeros([virtImgHeight,virtImgWidth,4],dtype=numpy.uint8)
+	warnings = []
+	if swizzled:
+		sourceIndexes = get_swizzle_map(blockCountX,blockCountY,blockBytes)
+	else:
+		sourceIndexes = numpy.arange(blockCountX*blockCountY)
+	if len(rawData) < (int(sourceIndexes.max())+1)*blockBytes:
+		warnings.append("has less data than its size needs ("+str(len(rawData))+" bytes); the rest will be blank")
+	stripRows = max(1,decodeStripBlocks // max(1,blockCountX))
+	reservedBlocks = 0
+	for rowStart in range(0,blockCountY,stripRows):
+		rowEnd = min(rowStart+stripRows,blockCountY)
+		blocks = gather_blocks(rawData,sourceIndexes[rowStart*blockCountX:rowEnd*blockCountX],blockBytes)
+		# the output's upside down, so strips fill it from the top of the array down to the bottom
+		out[virtImgHeight-rowEnd*blockSize:virtImgHeight-rowStart*blockSize] = assemble_blocks(decode_blocks(imgFormat,blocks,blueBC5),blockCountX,rowEnd-rowStart)
+		if imgFormat == "BC7_UNORM":
+			reservedBlocks += count_bc7_reserved_blocks(blocks)
+	if reservedBlocks > 0:
+		warnings.append("contained illegal BC7 blocks (rendered as transparent black)")
+	return out,warnings
+
+# decoded textures are kept on disk so that re-importing the same model doesn't mean decoding everything all over again
+# entries are named after a hash of everything that affects the result, so they never need invalidating, only evicting (least recently used first) once the folder gets too big
+# they're plain .npy files, so they can be memory-mapped straight back in rather than read
+# bump the version whenever the decoders would give different results for the same data
+textureCacheVersion = 2
+textureCacheStats = {"hits":0,"misses":0} # for the whole session, not just one import
+
+# raw texture data can be many MB, so it only gets hashed the once, and anything that needs a key from it (the cache, the texture registry) hashes this instead
+def texture_data_digest(rawData):
+	return hashlib.blake2b(rawData,digest_size=20).digest()
+
+class TextureCache():
+	def __init__(self,folder=None,sizeLimit=1024*1024*1024): # sizeLimit in bytes
+		if not folder:
+			folder = os.path.join(tempfile.gettempdir(),"monado_forge_texture_cache")
+		self.folder = folder
+		self.sizeLimit = sizeLimit
+		os.makedirs(self.folder,exist_ok=True)
+	
+	def key(self,imgType,imgWidth,imgHeight,dataDigest,blueBC5): # dataDigest from texture_data_digest
+		h = hashlib.blake2b(digest_size=20)
+		h.update(struct.pack("<LLLL?",textureCacheVersion,imgType,imgWidth,imgHeight,blueBC5))
+		h.update(dataDigest)
+		return h.hexdigest()
+	
+	def path(self,key):
+		return os.path.join(self.folder,key+".npy")
+	
+	# gives back the pixels (read-only, memory-mapped) or None if they aren't cached
+	def load(self,key):
+		path = self.path(key)
+		try:
+			pixels = numpy.load(path,mmap_mode="r")
+			os.utime(path) # counts as being used, as far as eviction goes
+		except (OSError,ValueError): # not there (or broken, in which case it'll just get overwritten)
+			textureCacheStats["misses"] += 1
+			return None
+		textureCacheStats["hits"] += 1
+		return pixels
+	
+	def store(self,key,pixels):
+		path = self.path(key)
+		tempPath = path+"."+str(os.getpid())+".tmp" # so that nothing can ever load a half-written file
+		try:
+			with open(tempPath,"wb") as f:
+				numpy.save(f,pixels)
+			os.replace(tempPath,path)
+		except OSError: # out of space or similar, no reason to stop the import over it
+			try:
+				os.remove(tempPath)
+			except OSError:
+				pass
+			return
+		self.evict()
+	
+	def evict(self):
+		entries = []
+		totalSize = 0
+		for e in os.scandir(self.folder):
+			if e.name.endswith(".npy"):
+				stat = e.stat()
+				entries.append([stat.st_mtime,stat.st_size,e.path])
+				totalSize += stat.st_size
+		entries.sort()
+		for mtime,size,path in entries:
+			if totalSize <= self.sizeLimit:
+				break
+			try:
+				os.remove(path)
+				totalSize -= size
+			except OSError: # in use (Windows won't delete a mapped file), so leave it for next time
+				pass
+
+# bare-bones PNG writer, so saving textures needs neither Blender nor the main thread (zlib lets go of the GIL while it works)
+# pixels are (H,W,4) uint8 in Blender's order (bottom row first), so they get flipped here since PNG goes top down
+# channel: only write that one channel, as a greyscale image (for split "temp" channels)
+# every row uses the "up" filter (difference from the row above), which is one array op and compresses far better than no filter
+# rows are filtered and compressed a strip at a time (each strip its own IDAT chunk), so there's never a second whole copy of the image
+pngStripBytes = 1024*1024
+def write_png(filepath,pixels,compressionLevel=6,channel=None):
+	rows = pixels[::-1]
+	colourType = 6 # RGBA
+	if channel is not None:
+		rows = rows[:,:,channel]
+		colourType = 0 # greyscale
+	height,width = rows.shape[0:2]
+	rowBytes = rows[0].size if height > 0 else 0
+	stripRows = max(1,pngStripBytes // max(1,rowBytes))
+	def chunk(chunkType,data):
+		return struct.pack(">L",len(data))+chunkType+data+struct.pack(">L",zlib.crc32(chunkType+data))
+	with open(filepath,"wb") as f:
+		f.write(b"\x89PNG\r\n\x1a\n")
+		f.write(chunk(b"IHDR",struct.pack(">LLBBBBB",width,height,8,colourType,0,0,0)))
+		compressor = zlib.compressobj(compressionLevel)
+		previousRow = numpy.zeros(rowBytes,dtype=numpy.uint8) # the row "above" the first is all 0s
+		for rowStart in range(0,height,stripRows):
+			strip = numpy.ascontiguousarray(rows[rowStart:rowStart+stripRows]).reshape(-1,rowBytes)
+			filtered = numpy.empty([len(strip),rowBytes+1],dtype=numpy.uint8)
+			filtered[:,0] = 2 # filter type "up"
+			numpy.subtract(strip[0],previousRow,out=filtered[0,1:]) # wraps around, as it should
+			numpy.subtract(strip[1:],strip[:-1],out=filtered[1:,1:])
+			previousRow = strip[-1]
+			compressed = compressor.compress(filtered)
+			if compressed:
+				f.write(chunk(b"IDAT",compressed))
+		f.write(chunk(b"IDAT",compressor.flush()))
+		f.write(chunk(b"IEND",b""))
+
+# what texture worker processes actually run (see TextureDecodeQueue in utils)
+# the main process makes the shared memory block, the worker decodes straight into it, so the pixels never get pickled
+def decode_texture_to_shared_memory(blockName,imgType,imgWidth,imgHeight,rawData,blueBC5=False):
+	imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
+	sharedBlock = shared_memory.SharedMemory(name=blockName)
+	try:
+		pixels = numpy.ndarray([virtImgHeight,virtImgWidth,4],dtype=numpy.uint8,buffer=sharedBlock.buf)
+		pixels,warnings = decode_texture(imgType,imgWidth,imgHeight,rawData,blueBC5,out=pixels)
+		del pixels # has to go before the block can be closed
+	finally:
+		sharedBlock.close()
+	return warnings
+
+def register():
+	pass
+
+def unregister():
+	pass
+
+#[...]
@@ -1,13 +1,20 @@
 import bpy
+import collections
+import concurrent.futures
+import hashlib
 import io
 import math
 import mathutils
+import mmap
+import multiprocessing
 import numpy
 import os
 import struct
 from contextlib import redirect_stdout
+from multiprocessing import shared_memory
 
 from . classes import *
+from . texture_funcs import *
 
 # math constants
 
@@ -67,8 +74,6 @@ def print_progress_bar(n,d,t): # numerator, denominator, text
 		print_bar(n/d)
 		print(" "+str(n)+" / "+str(d))
 
-swizzleMapCache = {}
-
 # file reading
 
 u8CodeB = ">B"
@@ -118,6 +123,13 @@ def readAndParseFloatBig(inFile):
 	return struct.unpack(fpCodeB,inFile.read(struct.calcsize(fpCodeB)))[0]
 
 def readStr(inFile):
+	if isinstance(inFile,BufferView): # can just look for the end instead of going byte by byte
+		start = inFile.tell()
+		end = inFile.find(b"\x00",start)
+		if end < 0:
+			end = len(inFile)
+		inFile.seek(min(end+1,len(inFile)))
+		return bytes(inFile.view[start:end]).decode("utf-8")
 	strBytes = b""
 	c = inFile.read(1)
 	while c != b"\x00" and c != b"":
@@ -125,11 +137,97 @@ def readStr(inFile):
 		c = inFile.read(1)
 	return strBytes.decode("utf-8")
 def readFixedLenStr(inFile,length):
-	strBytes = b""
-	for i in range(length):
-		c = inFile.read(1)
-		strBytes += c
-	return strBytes.decode("utf-8")
+	return bytes(inFile.read(length)).decode("utf-8")
+
+# read-only window onto some bytes (usually a decompressed subfile) that acts enough like a file for the readAndParse functions
+# reads and slices give back memoryviews into the original data rather than copies, so nothing is duplicated however much it's passed around
+# (anything that needs actual bytes, like a dict key or a string, has to ask for them with bytes())
+class BufferView():
+	def __init__(self,data):
+		self.view = memoryview(data).cast("B")
+		if not self.view.readonly:
+			self.view = self.view.toreadonly()
+		self.pointer = 0
+		# memoryviews can't search, so keep hold of whatever's underneath (and where this starts in it) for find()
+		self.source = data if hasattr(data,"find") else None
+		self.sourceOffset = 0
+	def __len__(self):
+		return len(self.view)
+	def read(self,size=-1):
+		if size is None or size < 0:
+			size = len(self.view)-self.pointer
+		start = self.pointer
+		self.pointer = min(start+size,len(self.view))
+		return self.view[start:self.pointer]
+	def seek(self,offset,whence=0):
+		if whence == 1:
+			offset += self.pointer
+		elif whence == 2:
+			offset += len(self.view)
+		self.pointer = max(0,offset)
+		return self.pointer
+	def tell(self):
+		return self.pointer
+	# a new BufferView of just part of this one (its offsets start from 0 again)
+	def slice(self,offset,size):
+		sliced = BufferView(self.view[offset:offset+size])
+		sliced.source = self.source
+		sliced.sourceOffset = self.sourceOffset+min(offset,len(self.view))
+		return sliced
+	# same as bytes.find (offsets are relative to this view, not whatever's underneath)
+	def find(self,sub,start=0):
+		if self.source is None: # have to copy to search, but nothing in here makes one of these
+			found = self.view[start:].tobytes().find(sub)
+			return found+start if found >= 0 else -1
+		found = self.source.find(sub,self.sourceOffset+start,self.sourceOffset+len(self.view))
+		return found-self.sourceOffset if found >= 0 else -1
+	def unpack_from(self,structFormat,offset):
+		return struct.unpack_from(structFormat,self.view,offset)
+	def close(self): # nothing to close, but lets it stand in for a file
+		pass
+
+# an input file mapped into memory rather than read, so all the little header/string reads are just memory accesses instead of syscalls
+# (only the parts that actually get looked at are ever loaded, which matters a lot for big files on slow or network drives)
+# use like open(): "with MappedFile(filepath) as f:"
+class MappedFile(BufferView):
+	def __init__(self,filepath):
+		self.name = filepath
+		self.mapping = None
+		with open(filepath,"rb") as f:
+			if os.fstat(f.fileno()).st_size > 0: # empty files can't be mapped
+				self.mapping = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+		super().__init__(self.mapping if self.mapping is not None else b"")
+	def close(self):
+		self.view.release()
+		if self.mapping is not None:
+			try:
+				self.mapping.close()
+			except BufferError: # something still has a view of it (e.g. a traceback), so it'll have to be closed when that's gone
+				pass
+			self.mapping = None
+	def __enter__(self):
+		return self
+	def __exit__(self,excType,excValue,traceback):
+		self.close()
+
+# a fixed-size record in a file, read in one go (a single read and unpack) rather than field by field
+# fields are space-separated names, one per value the format gives back (padding bytes don't get one)
+# results are namedtuples, so they can be used by field name or unpacked like any other list
+class RecordLayout():
+	def __init__(self,name,structFormat,fields):
+		self.struct = struct.Struct(structFormat)
+		self.size = self.struct.size
+		self.record = collections.namedtuple(name,fields)
+	def unpack(self,data):
+		return self.record._make(self.struct.unpack(data))
+	# buffer can be anything bytes-like, or a BufferView
+	def unpack_from(self,buffer,offset=0):
+		if isinstance(buffer,BufferView):
+			buffer = buffer.view
+		return self.record._make(self.struct.unpack_from(buffer,offset))
+	# from the current position of a file (or BufferView), leaving it just after the record
+	def read(self,f):
+		return self.record._make(self.struct.unpack(f.read(self.size)))
 
 # https://stackoverflow.com/questions/10689748/how-to-read-bits-from-a-file
 # tweaked to operate directly on a bytearray so an extra file-like object isn't needed
@@ -308,100 +406,6 @@ def cleanup_mesh(context,meshObj,looseVerts,emptyGroups,emptyShapes):
 			meshObj.shape_key_remove(r)
 	context.view_layer.objects.active = tempActive
 
-# https://learn.microsoft.com/en-us/windows/win32/api/dxgiformat/ne-dxgiformat-dxgi_format
-# uses the "raw" values taken from the code rather than the ones in the MS enum (we aren't calling any MS code so we don't need it)
-# only contains things we know of (rather than future-proofing with extra entries) since how're we supposed to guess what the raw numbers equate to
-# (it's pretty obvious that 67 = BC2 and 76 = BC6, but those formats are rare anyway)
-# [formatName, bitsPerPixel]
-# possible additions: 1:R8Unorm, 41:R16G16B16A16Float, 109:B8G8R8A8Unorm, https://github.com/PredatorCZ/XenoLib/blob/master/include/xenolib/lbim.hpp
-imageFormats = {
-				37:["R8G8B8A8_UNORM",32],
-				66:["BC1_UNORM",4], # aka DXT1
-				68:["BC3_UNORM",8], # aka DXT5
-				73:["BC4_UNORM",4],
-				75:["BC5_UNORM",8],
-				77:["BC7_UNORM",8],
-				}
-
-# BC7 needs a *lot* of external junk
-# https://registry.khronos.org/DataFormat/specs/1.3/dataformat.1.3.html#bptc_bc7
-# https://github.com/python-pillow/Pillow/blob/main/src/libImaging/BcnDecode.c
-# [subsetCount, partitionBits, rotationBits, indexSelectionBits, colourBits, alphaBits, endpointPBits, sharedPBits, indexBits, index2Bits]
-bc7ModeData = {
-				0:[3, 4, 0, 0, 4, 0, 1, 0, 3, 0],
-				1:[2, 6, 0, 0, 6, 0, 0, 1, 3, 0],
-				2:[3, 6, 0, 0, 5, 0, 0, 0, 2, 0],
-				3:[2, 6, 0, 0, 7, 0, 1, 0, 2, 0],
-				4:[1, 0, 2, 1, 5, 6, 0, 0, 2, 3],
-				5:[1, 0, 2, 0, 7, 8, 0, 0, 2, 2],
-				6:[1, 0, 0, 0, 7, 7, 1, 0, 4, 0],
-				7:[2, 6, 0, 0, 5, 5, 1, 0, 2, 0],
-				}
-bc7Weights = {
-				2:[0, 21, 43, 64],
-				3:[0, 9, 18, 27, 37, 46, 55, 64],
-				4:[0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64],
-				}
-# bitmaps of which subsets each pixel uses, [row,column] order
-bc7PartitionMaps = {
-					2:[
-						0xcccc, 0x8888, 0xeeee, 0xecc8, 0xc880, 0xfeec, 0xfec8, 0xec80,
-						0xc800, 0xffec, 0xfe80, 0xe800, 0xffe8, 0xff00, 0xfff0, 0xf000,
-						0xf710, 0x008e, 0x7100, 0x08ce, 0x008c, 0x7310, 0x3100, 0x8cce,
-						0x088c, 0x3110, 0x6666, 0x366c, 0x17e8, 0x0ff0, 0x718e, 0x399c,
-						0xaaaa, 0xf0f0, 0x5a5a, 0x33cc, 0x3c3c, 0x55aa, 0x9696, 0xa55a,
-						0x73ce, 0x13c8, 0x324c, 0x3bdc, 0x6996, 0xc33c, 0x9966, 0x0660,
-						0x0272, 0x04e4, 0x4e40, 0x2720, 0xc936, 0x936c, 0x39c6, 0x639c,
-						0x9336, 0x9cc6, 0x817e, 0xe718, 0xccf0, 0x0fcc, 0x7744, 0xee22,
-						],
-					3:[
-						0xaa685050, 0x6a5a5040, 0x5a5a4200, 0x5450a0a8, 0xa5a50000, 0xa0a05050, 0x5555a0a0, 0x5a5a5050,
-						0xaa550000, 0xaa555500, 0xaaaa5500, 0x90909090, 0x94949494, 0xa4a4a4a4, 0xa9a59450, 0x2a0a4250,
-						0xa5945040, 0x0a425054, 0xa5a5a500, 0x55a0a0a0, 0xa8a85454, 0x6a6a4040, 0xa4a45000, 0x1a1a0500,
-						0x0050a4a4, 0xaaa59090, 0x14696914, 0x69691400, 0xa08585a0, 0xaa821414, 0x50a4a450, 0x6a5a0200,
-						0xa9a58000, 0x5090a0a8, 0xa8a09050, 0x24242424, 0x00aa5500, 0x24924924, 0x24499224, 0x50a50a50,
-						0x500aa550, 0xaaaa4444, 0x66660000, 0xa5a0a5a0, 0x50a050a0, 0x69286928, 0x44aaaa44, 0x66666600,
-						0xaa444444, 0x54a854a8, 0x95809580, 0x96969600, 0xa85454a8, 0x80959580, 0xaa141414, 0x96960000,
-						0xaaaa1414, 0xa05050a0, 0xa0a5a5a0, 0x96000000, 0x40804080, 0xa9a8a9a8, 0xaaaaaa44, 0x2a4a5254,
-						],
-					}
-# one index per subset is stored wlith one fewer bit because it is known to be 0 - this is the list of such indexes
-bc7AnchorIndexes = {
-					"1/1":[0]*64,
-					"1/2":[0]*64,
-					"2/2":[
-							15, 15, 15, 15, 15, 15, 15, 15,
-							15, 15, 15, 15, 15, 15, 15, 15,
-							15, 2, 8, 2, 2, 8, 8, 15,
-							2, 8, 2, 2, 8, 8, 2, 2,
-							15, 15, 6, 8, 2, 8, 15, 15,
-							2, 8, 2, 2, 2, 15, 15, 6,
-							6, 2, 6, 8, 15, 15, 2, 2,
-							15, 15, 15, 15, 15, 2, 2, 15
-							],
-					"1/3":[0]*64,
-					"2/3":[
-							3, 3, 15, 15, 8, 3, 15, 15,
-							8, 8, 6, 6, 6, 5, 3, 3,
-							3, 3, 8, 15, 3, 3, 6, 10,
-							5, 8, 8, 6, 8, 5, 15, 15,
-							8, 15, 3, 5, 6, 10, 8, 15,
-							15, 3, 15, 5, 15, 15, 15, 15,
-							3, 15, 5, 5, 5, 8, 5, 10,
-							5, 10, 8, 13, 15, 12, 3, 3
-							],
-					"3/3":[
-							15, 8, 8, 3, 15, 15, 3, 8,
-							15, 15, 15, 15, 15, 15, 15, 8,
-							15, 8, 15, 3, 15, 8, 15, 8,
-							3, 15, 6, 10, 15, 15, 10, 8,
-							15, 3, 15, 10, 10, 8, 9, 10,
-							6, 15, 8, 15, 3, 6, 6, 8,
-							15, 3, 15, 15, 15, 15, 15, 15,
-							15, 15, 15, 15, 3, 15, 15, 8
-							],
-					}
-
 # much of this is just grabbed from XBC2MD, but only after understanding it (rather than blindly copy-pasting anything)
 # REMINDER: don't manipulate image.pixels directly/individually or things will be dummy slow https://blender.stackexchange.com/questions/3673/
 # references:
@@ -419,87 +423,48 @@ def parse_texture(textureName,imgVersion,imgType,imgWidth,imgHeight,rawData,blue
 	except KeyError:
 		print_error(textureName+" is of an unknown/unsupported image type (id "+str(imgType)+")")
 		return
-	
-	# first, check to see if image of the intended name exists already, and how to proceed
-	try:
-		existingImage = bpy.data.images[textureName]
-		if overwrite:
-			bpy.data.images.remove(existingImage)
-	except KeyError as e: # no existing image of the same name
-		pass # fine, move on
-	newImage = bpy.data.images.new(textureName,imgWidth,imgHeight,alpha=True)
-	# don't really want to do any of this until the end, but apparently setting the filepath after setting the pixels clears the image for no good reason
-	newImage.file_format = "PNG"
+	pixels = decode_texture_pixels(textureName,imgType,imgWidth,imgHeight,rawData,blueBC5,printProgress)
 	if saveTo:
-		newImage.filepath = os.path.join(saveTo,textureName+".png")
-	
-	blockSize = 4 # in pixels
-	unswizzleBufferSize = bitsPerPixel*2 # needs a better name at some point
-	if imgFormat == "R8G8B8A8_UNORM": # blocks are single pixels rather than 4x4
-		blockSize = 1
-		unswizzleBufferSize = bitsPerPixel // 8
-	# since the minimum block size is 4, images must be divisible by 4 - extend them as necessary
-	virtImgWidth = imgWidth if imgWidth % blockSize == 0 else imgWidth + (blockSize - (imgWidth % blockSize))
-	virtImgHeight = imgHeight if imgHeight % blockSize == 0 else imgHeight + (blockSize - (imgHeight % blockSize))
-	# gotta create the image in full emptiness to start with, so we can random-access-fill the blocks as they come
-	# Blender always needs alpha, so colours must be length 4
-	pixels = numpy.zeros([virtImgHeight*virtImgWidth,4],dtype=float)
-	
+		return load_saved_texture_images(save_texture_images(textureName,imgWidth,imgHeight,pixels,printProgress,saveTo,dechannelise),overwrite)
+	return create_texture_images(textureName,imgWidth,imgHeight,pixels,printProgress,overwrite,dechannelise)
+
+# whether a texture of this size is allowed by the max texture size setting (0: no limit)
+def texture_within_size(imgWidth,imgHeight,maxSize):
+	return maxSize <= 0 or max(imgWidth,imgHeight) <= maxSize
+
+# whether it's worth unpacking a bigger version of a texture, given the size of the one we already have (None if there isn't one)
+def bigger_texture_wanted(currentSize,maxSize):
+	return currentSize is None or maxSize <= 0 or max(currentSize) < maxSize
+
+# turns the raw texture data into an (H,W,4) array of pixels (at the virtual size, bottom row first)
+def decode_texture_pixels(textureName,imgType,imgWidth,imgHeight,rawData,blueBC5,printProgress):
+	imgFormat,blockSize,unswizzleBufferSize,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
 	blockCountX = virtImgWidth // blockSize
 	blockCountY = virtImgHeight // blockSize
 	blockCount = blockCountX*blockCountY
-	tileWidth = clamp(16 // unswizzleBufferSize, 1, 16)
-	tileCountX = ceildiv(blockCountX,tileWidth)
-	tileCountY = blockCountY # since tile height is always 1
-	tileCount = tileCountX*tileCountY
-	# essentially, how many unswizzled "rows" must we read to get a full "column" (in tiles)
-	# this controls how wide the column chunk must be
-	# not currently used (dunno if it later needs to be)
-	columnStackSize = clamp(blockCountY // 8, 1, 16)
-	
-	d = io.BytesIO(rawData)
-	#print(imgFormat)
 	
-	try:
-		swizzlist = swizzleMapCache[f"{tileCountY},{tileCountX}"]
-	except KeyError:
-		swizzleTileMap = numpy.full([tileCountY,tileCountX],-1,dtype=int)
-		# swizzle pattern: (may need to change as larger images are discovered, but should be correct for smaller ones)
-		# x = 10001111111000010010
-		# y = 01110000000111101101
-		# [x9, y9, y8, y7, x8, x7, x6, x5, x4, x3, x2, y6, y5, y4, y3, x1, y2, y1, x0, y0]
-		# the distinction between z and currentTile is so we can draw the z-curve out of bounds while keeping all valid values in-bounds
-		currentTile = 0
-		z = -1 # will be incremented to 0 shortly
-		while currentTile < tileCountY*tileCountX:
-			if z > 10000000:
-				print_error("Bad z-loop detected in image "+textureName+": z = "+str(z)+"; currentTile = "+str(currentTile))
-				break
-			z += 1
-			y = ((z&0x70000)>>9) | ((z&0x1E0)>>2) | ((z&0xC)>>1) | (z&0x1)
-			if y >= len(swizzleTileMap): continue
-			x = ((z&0x80000)>>10) | ((z&0xFE00)>>7) | ((z&0x10)>>3) | ((z&0x2)>>1)
-			if x >= len(swizzleTileMap[y]): continue
-			swizzleTileMap[y,x] = currentTile
-			currentTile += 1
-		swizzlist = swizzleTileMap.flatten().tolist()
-		swizzleMapCache[f"{tileCountY},{tileCountX}"] = swizzlist
-		#print(swizzlist)
-	#swizzlist = range(blockCountX*blockCountY) # no-op option for debugging
 	monochrome = True
-	unassignedCount = False
 	bc7Mode8Flag = False
-	for t in range(tileCount):
-		if swizzlist[t] == -1:
-			unassignedCount += 1
-			continue
-		if printProgress and t % 64 == 0: # printing for every single t racks up the import time a lot (e.g. 12s to 20s)
-			print_progress_bar(t,tileCount,textureName)
-		d.seek(swizzlist[t]*(unswizzleBufferSize*tileWidth))
-		for t2 in range(tileWidth):
-			targetTile = t
-			targetBlock = t*tileWidth + t2
-			if targetBlock >= blockCount: continue # can happen for tiny textures, not a problem
+	if imgFormat in bulkDecodeFormats:
+		if printProgress:
+			print_progress_bar(0,blockCount,textureName)
+		pixels,warnings = decode_texture(imgType,imgWidth,imgHeight,rawData,blueBC5)
+		for w in warnings:
+			print_warning("Texture "+textureName+" "+w)
+	else:
+		# gotta create the image in full emptiness to start with, so we can random-access-fill the blocks as they come
+		# Blender always needs alpha, so colours must be length 4
+		# (this path still works in floats, they get turned into bytes at the end)
+		pixels = numpy.zeros([virtImgHeight*virtImgWidth,4],dtype=float)
+		# for every block in the final image (top row first), where it is in the swizzled data
+		sourceIndexes = get_swizzle_map(blockCountX,blockCountY,unswizzleBufferSize)
+		if len(rawData) < (int(sourceIndexes.max())+1)*unswizzleBufferSize:
+			print_warning("Texture "+textureName+" has less data than its size needs ("+str(len(rawData))+" bytes); the rest will be blank")
+		d = io.BytesIO(rawData)
+		for targetBlock in range(blockCount):
+			if printProgress and targetBlock % 256 == 0: # printing for every single block racks up the import time a lot (e.g. 12s to 20s)
+				print_progress_bar(targetBlock,blockCount,textureName)
+			d.seek(int(sourceIndexes[targetBlock])*unswizzleBufferSize)
 			targetBlockX = targetBlock % blockCountX
 			targetBlockY = targetBlock // blockCountX
 			# convert block to pixel (Y is inverted, X is not)
@@ -766,73 +731,471 @@ def parse_texture(textureName,imgVersion,imgType,imgWidth,imgHeight,rawData,blue
 						b,a = a,b
 					pi = [12,13,14,15,8,9,10,11,4,5,6,7,0,1,2,3][p]
 					pixels[(blockRootPixelX + pi % 4) + ((blockRootPixelY + pi // 4) * virtImgWidth)] = [r/255.0,g/255.0,b/255.0,a/255.0]
+		d.close()
+		pixels = float_to_uint8(pixels).reshape([virtImgHeight,virtImgWidth,4])
 	if printProgress:
-		print_progress_bar(tileCount,tileCount,textureName)
-	if unassignedCount > 0:
-		print_error("Texture "+textureName+" didn't complete deswizzling correctly: "+str(unassignedCount)+" / "+str(tileCountY*tileCountX)+" tiles unassigned")
+		print_progress_bar(blockCount,blockCount,textureName)
 	if bc7Mode8Flag:
 		print_warning("Texture "+textureName+" contained illegal BC7 blocks (rendered as transparent black)")
-	d.close()
-	
-	finalImages = [[newImage,pixels]]
-	channelMult = [
-					[[1,1,1,0],[0,0,0,0],[0,0,0,0],[0,0,0,0]],
-					[[0,0,0,0],[1,1,1,0],[0,0,0,0],[0,0,0,0]],
-					[[0,0,0,0],[0,0,0,0],[1,1,1,0],[0,0,0,0]],
-					[[0,0,0,0],[0,0,0,0],[0,0,0,0],[1,1,1,0]],
-					]
+	return pixels
+
+# which images a texture turns into: [[image name, which channel it's a split of (None for the texture itself)],...]
+def split_texture_channels(textureName,pixels,printProgress,dechannelise=False):
+	finalImages = [[textureName,None]]
 	if dechannelise:
+		pixels = pixels.reshape([-1,4])
+		# detect channels that are entirely black or white and don't include them
+		# if a channel is entirely some sort of grey, that's still worth including
+		# (all four channels get checked in one go, and before any images are made, so no time is wasted on one that'd be discarded)
+		constantChannels = (pixels == pixels[0]).all(axis=0)
 		for i,c in enumerate(["r","g","b","a"]):
-			splitName = textureName+"_"+c
-			try:
-				existingSplitImage = bpy.data.images[splitName]
-				if overwrite:
-					bpy.data.images.remove(existingSplitImage)
-			except KeyError as e: # no existing image of the same name
-				pass # fine, move on
-			newSplitImage = bpy.data.images.new(splitName,imgWidth,imgHeight)
-			# don't really want to do any of this until the end, but apparently setting the filepath after setting the pixels clears the image for no good reason
-			newSplitImage.file_format = "PNG"
-			if saveTo:
-				newSplitImage.filepath = os.path.join(saveTo,splitName+".png")
-			# detect channels that are entirely black or white and don't include them
-			# if a channel is entirely some sort of grey, that's still worth including
-			mono = True
 			first = pixels[0][i]
-			if first != 0 and first != 1:
-				mono = False
-			splitPixels = numpy.zeros([virtImgHeight*virtImgWidth,4],dtype=float)
-			# this check is quick enough even on big images it can be done separately to avoid wasting time on creating an image that is later discarded
-			for j,p in enumerate(pixels):
-				if p[i] != first:
-					mono = False
-					break
-			if mono:
+			if constantChannels[i] and (first == 0 or first == 255):
 				if printProgress:
-					print("Excluding channel "+c.upper()+" (all pixels "+str(first)+")")
-				bpy.data.images.remove(newSplitImage)
+					print("Excluding channel "+c.upper()+" (all pixels "+str(first/255)+")")
 				continue
-			barCount = len(pixels)
-			for j,p in enumerate(pixels):
-				splitPixels[j] = p @ channelMult[i] + [0,0,0,1] # the addition is to force alpha to be 1.0 in all cases (not really possible as part of the matmult)
-				if printProgress and j % 1024 == 0:
-					print_progress_bar(j,barCount,splitName)
-			finalImages.append([newSplitImage,splitPixels])
-			if printProgress:
-				print_progress_bar(barCount,barCount,splitName)
+			finalImages.append([textureName+"_"+c,i])
+	return finalImages
+
+# makes the Blender image(s) straight out of decoded pixels, for when they aren't being saved
+def create_texture_images(textureName,imgWidth,imgHeight,pixels,printProgress,overwrite=True,dechannelise=False):
+	virtImgHeight,virtImgWidth = pixels.shape[0:2]
+	# final pixel data must be flattened (and, if necessary, cropped), and Blender only takes floats
+	# this is the one and only place the pixels become floats, and only one image at a time
+	# split channels are read straight out of the decoded pixels rather than having their own copy made first
+	visiblePixels = pixels.reshape([virtImgHeight,virtImgWidth,4])[0:imgHeight,0:imgWidth]
+	finalNames = []
+	for imageName,channel in split_texture_channels(textureName,pixels,printProgress,dechannelise):
+		# first, check to see if image of the intended name exists already, and how to proceed
+		try:
+			existingImage = bpy.data.images[imageName]
+			if overwrite:
+				bpy.data.images.remove(existingImage)
+		except KeyError as e: # no existing image of the same name
+			pass # fine, move on
+		newImage = bpy.data.images.new(imageName,imgWidth,imgHeight,alpha=True)
+		if channel is None:
+			floatPixels = numpy.multiply(visiblePixels,numpy.float32(1/255),dtype=numpy.float32)
+		else: # greyscale of the one channel, with alpha forced to 1.0
+			floatPixels = numpy.empty([imgHeight,imgWidth,4],dtype=numpy.float32)
+			numpy.multiply(visiblePixels[:,:,channel,None],numpy.float32(1/255),out=floatPixels[:,:,0:3])
+			floatPixels[:,:,3] = 1.0
+		newImage.pixels.foreach_set(floatPixels.ravel())
+		del floatPixels
+		newImage.update()
+		finalNames.append(newImage.name)
+	return finalNames[0] # pass back whatever the final name of the image ended up being
+
+# PNG writing happens on background threads (see write_png), so the decoding/parsing can carry on in the meantime
+pngWriterPool = None
+pngWritesByPath = {} # {filepath : future of the latest write to it}, since a texture and its higher-res replacement can share a name
+
+def get_png_writer_pool():
+	global pngWriterPool
+	if not pngWriterPool:
+		pngWriterPool = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1,thread_name_prefix="MonadoForgePNG")
+	return pngWriterPool
+
+def shutdown_png_writer_pool():
+	global pngWriterPool
+	if pngWriterPool:
+		pngWriterPool.shutdown(wait=True) # don't want half-written files
+	pngWriterPool = None
+	pngWritesByPath.clear()
+
+# two writes to the same file at once makes a mess of it, so each one waits for whatever was writing there before
+# (the pool takes things in order, so the earlier write is always already going by the time this is, so no deadlock)
+def write_png_after(previousWrite,filepath,pixels,compressionLevel,channel):
+	if previousWrite:
+		concurrent.futures.wait([previousWrite]) # whether it worked or not, this one still gets written
+	write_png(filepath,pixels,compressionLevel,channel)
+
+# starts writing the texture (and its split channels) out as PNGs, and gives back [[image name, filepath, future],...] for load_saved_texture_images
+# the pixels must not be changed or freed until then (so anything in shared memory has to stay there until the saves are done)
+def save_texture_images(textureName,imgWidth,imgHeight,pixels,printProgress,saveTo,dechannelise=False,compressionLevel=1):
+	virtImgHeight,virtImgWidth = pixels.shape[0:2]
+	visiblePixels = pixels.reshape([virtImgHeight,virtImgWidth,4])[0:imgHeight,0:imgWidth]
+	pendingSaves = []
+	for imageName,channel in split_texture_channels(textureName,pixels,printProgress,dechannelise):
+		filepath = os.path.join(saveTo,imageName+".png")
+		os.makedirs(os.path.dirname(filepath),exist_ok=True) # for the res0/res1/res2 subfolders
+		previousWrite = pngWritesByPath.get(filepath)
+		if previousWrite and previousWrite.done():
+			previousWrite = None
+		future = get_png_writer_pool().submit(write_png_after,previousWrite,filepath,visiblePixels,compressionLevel,channel)
+		pngWritesByPath[filepath] = future
+		pendingSaves.append([imageName,filepath,future])
+	return pendingSaves
+
+# waits for the PNGs to be written, then has Blender load them (which it does lazily, so no pixels get held on to here)
+# if something else has started writing to the same file since, that has to finish too, or Blender could see it half-written
+def load_saved_texture_images(pendingSaves,overwrite=True):
+	finalNames = []
+	for imageName,filepath,future in pendingSaves:
+		future.result()
+		latestWrite = pngWritesByPath.get(filepath)
+		if latestWrite:
+			latestWrite.result()
+			if pngWritesByPath.get(filepath) is latestWrite:
+				del pngWritesByPath[filepath]
+		try:
+			existingImage = bpy.data.images[imageName]
+			if overwrite:
+				bpy.data.images.remove(existingImage)
+		except KeyError as e: # no existing image of the same name
+			pass # fine, move on
+		newImage = bpy.data.images.load(filepath)
+		newImage.name = imageName
+		finalNames.append(newImage.name)
+	return finalNames[0] # pass back whatever the final name of the image ended up being
+
+# skips decoding entirely: writes the (deswizzled) data straight out as a .dds, then has Blender load that
+def save_texture_dds(textureName,imgType,imgWidth,imgHeight,rawData,saveTo,overwrite=True):
+	try:
+		imgFormat,bitsPerPixel = imageFormats[imgType]
+	except KeyError:
+		print_error(textureName+" is of an unknown/unsupported image type (id "+str(imgType)+")")
+		return
+	blockData,warnings = deswizzle_texture(imgType,imgWidth,imgHeight,rawData)
+	for w in warnings:
+		print_warning("Texture "+textureName+" "+w)
+	filepath = os.path.join(saveTo,textureName+".dds")
+	os.makedirs(os.path.dirname(filepath),exist_ok=True) # for the res0/res1/res2 subfolders
+	with open(filepath,"wb") as f:
+		f.write(build_dds_header(imgType,imgWidth,imgHeight))
+		f.write(blockData)
+	try:
+		existingImage = bpy.data.images[textureName]
+		if overwrite:
+			bpy.data.images.remove(existingImage)
+	except KeyError as e: # no existing image of the same name
+		pass # fine, move on
+	newImage = bpy.data.images.load(filepath)
+	newImage.name = textureName
+	return newImage.name
+
+# texture decoding can be handed off to other processes, since it doesn't need Blender for anything
+# they're spawned fresh rather than forked (forking all of Blender is asking for trouble), so the pool is kept around between imports
+textureDecodePool = None
+textureDecodePoolSize = 0
+
+def get_texture_decode_pool(workerCount):
+	global textureDecodePool,textureDecodePoolSize
+	if textureDecodePool and textureDecodePoolSize != workerCount:
+		shutdown_texture_decode_pool()
+	if not textureDecodePool:
+		textureDecodePool = concurrent.futures.ProcessPoolExecutor(max_workers=workerCount,mp_context=multiprocessing.get_context("spawn"))
+		textureDecodePoolSize = workerCount
+	return textureDecodePool
+
+def shutdown_texture_decode_pool():
+	global textureDecodePool,textureDecodePoolSize
+	if textureDecodePool:
+		textureDecodePool.shutdown(wait=False,cancel_futures=True)
+	textureDecodePool = None
+	textureDecodePoolSize = 0
+
+# xbc1 subfiles are plain zlib, which lets go of the GIL while it works, so several can be inflated at once on threads
+subfileInflatePool = None
+subfileInflateBudget = 512*1024*1024 # how many bytes of inflated subfiles are allowed to be in progress or waiting to be taken at once
+
+def get_subfile_inflate_pool():
+	global subfileInflatePool
+	if not subfileInflatePool:
+		subfileInflatePool = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count() or 1,thread_name_prefix="MonadoForgeInflate")
+	return subfileInflatePool
+
+def shutdown_subfile_inflate_pool():
+	global subfileInflatePool
+	if subfileInflatePool:
+		subfileInflatePool.shutdown(wait=False,cancel_futures=True)
+	subfileInflatePool = None
+
+# inflates subfiles on the pool in the order they were added, as many at once as the budget (by their claimed inflated sizes) allows
+# take() waits for one and frees its share of the budget, so anything held back can start while it's being parsed
+# a subfile bigger than the whole budget still gets its turn, it just has to go alone
+# adding the same key again doesn't inflate it twice, it just has to be taken that many times
+class SubfileInflateQueue():
+	def __init__(self,memoryBudget):
+		self.pool = get_subfile_inflate_pool()
+		self.memoryBudget = memoryBudget
+		self.inFlight = 0
+		self.jobs = {} # {key : job}
+		self.waiting = collections.deque() # keys of jobs not started yet
+	
+	def has(self,key):
+		return key in self.jobs
+	
+	# function(*args) does the actual inflating (on another thread), and size is how much memory its result will take
+	def add(self,key,size,function,*args):
+		if key in self.jobs:
+			self.jobs[key]["takers"] += 1
+			return
+		self.jobs[key] = {"size":size,"function":function,"args":args,"future":None,"takers":1}
+		self.waiting.append(key)
+		self.start()
+	
+	def start(self):
+		while self.waiting:
+			job = self.jobs[self.waiting[0]]
+			if self.inFlight > 0 and self.inFlight+job["size"] > self.memoryBudget:
+				break
+			self.waiting.popleft()
+			job["future"] = self.pool.submit(job["function"],*job["args"])
+			self.inFlight += job["size"]
 	
-	# final pixel data must be flattened (and, if necessary, cropped)
-	for fi,px in finalImages:
-		fi.pixels = px.reshape([virtImgHeight,virtImgWidth,4])[0:imgHeight,0:imgWidth].flatten()
-		fi.update()
-		if saveTo:
-			fi.save()
-	return newImage.name # pass back whatever the final name of the image ended up being
+	def take(self,key):
+		job = self.jobs[key]
+		if job["future"] is None: # not started yet, so do it right here rather than wait for everything ahead of it
+			self.waiting.remove(key)
+			job["future"] = concurrent.futures.Future()
+			try:
+				job["future"].set_result(job["function"](*job["args"]))
+			except Exception as e:
+				job["future"].set_exception(e)
+			self.inFlight += job["size"]
+		job["takers"] -= 1
+		if job["takers"] <= 0:
+			del self.jobs[key]
+			try:
+				return job["future"].result()
+			finally:
+				self.inFlight -= job["size"]
+				self.start()
+		return job["future"].result()
+	
+	# for when the rest aren't going to be needed after all
+	def cancel(self):
+		for job in self.jobs.values():
+			if job["future"]:
+				job["future"].cancel()
+		self.jobs.clear()
+		self.waiting.clear()
+		self.inFlight = 0
+
+# textures already imported this session, so that importing several models that share textures (eyes, skin, etc.) reuses the existing images instead of decoding them all over again
+# dict of {hash of the raw texture data and everything else that affects the result : name of the image in the Blender file}
+# the image also gets the hash as a custom property, in case the name has since been taken over by a different texture
+textureRegistry = {}
+textureRegistryProperty = "monado_forge_texture_hash"
+
+def texture_registry_key(imgType,imgWidth,imgHeight,dataDigest,blueBC5,dechannelise,keepCompressed): # dataDigest from texture_data_digest
+	h = hashlib.blake2b(digest_size=20)
+	h.update(struct.pack("<LLL???",imgType,imgWidth,imgHeight,blueBC5,dechannelise,keepCompressed))
+	h.update(dataDigest)
+	return h.hexdigest()
+
+# gives back the name of the image made from this texture earlier, or None if there isn't one (any more)
+def find_registered_texture(registryKey):
+	imageName = textureRegistry.get(registryKey)
+	if imageName is None:
+		return None
+	image = bpy.data.images.get(imageName)
+	if image is None or image.get(textureRegistryProperty) != registryKey:
+		del textureRegistry[registryKey]
+		return None
+	return imageName
+
+def register_texture(registryKey,imageName):
+	image = bpy.data.images.get(imageName)
+	if image is None:
+		return
+	image[textureRegistryProperty] = registryKey
+	textureRegistry[registryKey] = imageName
+
+# something might still have a view of the block (e.g. a writer thread that's only just finished with it), so it can't always be closed yet
+# unlinking it is what matters (so it doesn't outlive the import), and the memory itself goes once the last view of it does
+def release_shared_block(sharedBlock):
+	sharedBlock.unlink()
+	try:
+		sharedBlock.close()
+	except BufferError:
+		pass
+
+# sends textures off to the pool as they're found, and turns the results into Blender images back here (images can only be made on the main thread)
+# results come back in the order the textures were added, so later (higher-res) versions of a texture still win like they used to
+# only so many textures are allowed to be in flight at once, since each one holds a whole decoded image in shared memory
+# workerCount: 0 = one per CPU, 1 = no pool at all (everything gets decoded right here, like before)
+# keepCompressed: write .dds files instead of decoding (needs saveTo, and anything without an old-style .dds format, i.e. BC7, still gets decoded)
+# if saving, the PNGs are written in the background too, and only loaded into Blender once they're done (as late as possible, but again only so many at once)
+class TextureDecodeQueue():
+	def __init__(self,workerCount,blueBC5,printProgress,saveTo=None,cache=None,keepCompressed=False,compressionLevel=1):
+		if workerCount <= 0:
+			workerCount = os.cpu_count() or 1
+		self.keepCompressed = keepCompressed
+		if keepCompressed and not saveTo:
+			print_warning("Textures can only be kept compressed if they're being saved somewhere; decoding them instead")
+			self.keepCompressed = False
+		self.pool = None
+		if workerCount > 1: # still wanted when keeping textures compressed, since some might need decoding anyway
+			try:
+				self.pool = get_texture_decode_pool(workerCount)
+			except Exception as e: # not being able to make processes isn't worth failing the import over
+				print_warning("Couldn't start texture decoding processes ("+str(e)+"); decoding in Blender instead")
+		self.maxPending = workerCount*2
+		self.blueBC5 = blueBC5
+		self.printProgress = printProgress
+		self.saveTo = saveTo
+		self.cache = cache
+		self.compressionLevel = compressionLevel
+		self.pending = collections.deque()
+		self.results = []
+		self.unloaded = collections.deque() # results whose images are still being saved
+		self.maxUnloaded = (os.cpu_count() or 1)*2
+		self.registered = {} # dict of {registry key : first job with it}, to catch duplicates within this import too
+		self.duplicates = []
+		self.warnedUnkeepable = False
+	
+	# key is whatever the caller wants to identify the result by (doesn't need to be unique)
+	def add(self,key,textureName,imgVersion,imgType,imgWidth,imgHeight,rawData,dechannelise=False):
+		job = {"key":key,"textureName":textureName,"imgVersion":imgVersion,"imgType":imgType,"imgWidth":imgWidth,"imgHeight":imgHeight,"rawData":rawData,"dechannelise":dechannelise,
+				"keepCompressed":False,"future":None,"sharedBlock":None,"cacheKey":None,"pixels":None,"registryKey":None,"existingName":None,"sameAs":None,"result":None}
+		if self.keepCompressed and imgType in imageFormats:
+			job["keepCompressed"] = dds_can_keep(imgType)
+			if not job["keepCompressed"] and not self.warnedUnkeepable:
+				print_warning(imageFormats[imgType][0]+" textures can't be kept compressed in a .dds that Blender can load; decoding them instead")
+				self.warnedUnkeepable = True
+		dataDigest = texture_data_digest(rawData) # the one and only pass over the raw data for the keys
+		job["registryKey"] = texture_registry_key(imgType,imgWidth,imgHeight,dataDigest,self.blueBC5,dechannelise,job["keepCompressed"])
+		job["existingName"] = find_registered_texture(job["registryKey"])
+		if not job["existingName"]:
+			if job["registryKey"] in self.registered:
+				job["sameAs"] = self.registered[job["registryKey"]]
+				self.duplicates.append(job)
+			else:
+				self.registered[job["registryKey"]] = job
+		if job["existingName"] or job["sameAs"]:
+			pass # nothing to decode
+		elif imgType in imageFormats and not job["keepCompressed"]:
+			if self.cache:
+				job["cacheKey"] = self.cache.key(imgType,imgWidth,imgHeight,dataDigest,self.blueBC5)
+				job["pixels"] = self.cache.load(job["cacheKey"])
+			if self.pool and job["pixels"] is None and imageFormats[imgType][0] in bulkDecodeFormats:
+				imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
+				sharedBlock = shared_memory.SharedMemory(create=True,size=max(1,virtImgHeight*virtImgWidth*4))
+				try:
+					job["future"] = self.pool.submit(decode_texture_to_shared_memory,sharedBlock.name,imgType,imgWidth,imgHeight,bytes(rawData),self.blueBC5)
+					job["sharedBlock"] = sharedBlock
+				except Exception as e: # pool is broken, no point in trying it again
+					print_warning("Texture decoding processes stopped working ("+str(e)+"); decoding in Blender instead")
+					sharedBlock.close()
+					sharedBlock.unlink()
+					shutdown_texture_decode_pool()
+					self.pool = None
+		self.pending.append(job)
+		while len(self.pending) > (self.maxPending if self.pool else 0):
+			self.realise(self.pending.popleft())
+	
+	def realise(self,job):
+		textureName = job["textureName"]
+		imgType,imgWidth,imgHeight = job["imgType"],job["imgWidth"],job["imgHeight"]
+		finalName = None
+		future = job["future"]
+		reused = job["existingName"] or job["sameAs"] # never sent to the pool, so there's no future either
+		if reused:
+			if self.printProgress:
+				print("Texture "+textureName+" has already been imported; reusing it")
+			finalName = job["existingName"] # duplicates within this import get filled in at the end, since the original might not be loaded yet
+		savingBlock = None # the shared memory the PNGs are still being written from, if any
+		if future:
+			sharedBlock = job["sharedBlock"]
+			job["sharedBlock"] = None
+			try:
+				try:
+					warnings = future.result()
+				except concurrent.futures.BrokenExecutor as e:
+					print_warning("Texture decoding processes stopped working ("+str(e)+"); decoding in Blender instead")
+					shutdown_texture_decode_pool()
+					self.pool = None
+					future = None
+				if future:
+					imgFormat,blockSize,blockBytes,virtImgWidth,virtImgHeight = get_texture_layout(imgType,imgWidth,imgHeight)
+					pixels = numpy.ndarray([virtImgHeight,virtImgWidth,4],dtype=numpy.uint8,buffer=sharedBlock.buf)
+					if self.printProgress:
+						print_progress_bar(1,1,textureName)
+					for w in warnings:
+						print_warning("Texture "+textureName+" "+w)
+					if self.cache:
+						self.cache.store(job["cacheKey"],pixels)
+					finalName = self.make_images(job,pixels)
+					if isinstance(finalName,list): # saving straight out of the block, so it has to stay until that's done (see load)
+						savingBlock = sharedBlock
+					del pixels # has to go before the block can be closed
+			finally:
+				if not savingBlock:
+					release_shared_block(sharedBlock)
+		if not future and not reused:
+			pixels = job["pixels"] # already there if it came from the cache
+			if job["keepCompressed"]:
+				finalName = save_texture_dds(textureName,imgType,imgWidth,imgHeight,job["rawData"],self.saveTo)
+			elif imgType not in imageFormats: # let parse_texture complain about it
+				finalName = parse_texture(textureName,job["imgVersion"],imgType,imgWidth,imgHeight,job["rawData"],self.blueBC5,self.printProgress,saveTo=self.saveTo,dechannelise=job["dechannelise"])
+			else:
+				if pixels is None:
+					pixels = decode_texture_pixels(textureName,imgType,imgWidth,imgHeight,job["rawData"],self.blueBC5,self.printProgress)
+					if self.cache:
+						self.cache.store(job["cacheKey"],pixels)
+				finalName = self.make_images(job,pixels)
+		result = [job["key"],finalName]
+		job["result"] = result
+		job["rawData"] = None # jobs are kept until the end (for duplicates), but their data isn't needed any more, and it may be a view that's keeping a whole subfile alive
+		job["pixels"] = None
+		self.results.append(result)
+		if isinstance(finalName,list): # still being saved
+			self.unloaded.append([result,savingBlock])
+			while len(self.unloaded) > self.maxUnloaded:
+				self.load(*self.unloaded.popleft())
+	
+	# either makes the images right away, or starts saving them (giving back the list of saves in progress)
+	def make_images(self,job,pixels):
+		if self.saveTo:
+			return save_texture_images(job["textureName"],job["imgWidth"],job["imgHeight"],pixels,self.printProgress,self.saveTo,job["dechannelise"],self.compressionLevel)
+		return create_texture_images(job["textureName"],job["imgWidth"],job["imgHeight"],pixels,self.printProgress,dechannelise=job["dechannelise"])
+	
+	def load(self,result,savingBlock=None):
+		try:
+			result[1] = load_saved_texture_images(result[1])
+		finally:
+			if savingBlock:
+				release_shared_block(savingBlock)
+	
+	# waits for everything, then gives back [key,final image name] for every texture, in the order they were added
+	def finish(self):
+		try:
+			while self.pending:
+				self.realise(self.pending.popleft())
+			while self.unloaded:
+				self.load(*self.unloaded.popleft())
+			for job in self.duplicates:
+				job["result"][1] = job["sameAs"]["result"][1]
+			for registryKey,job in self.registered.items():
+				if job["result"][1]:
+					register_texture(registryKey,job["result"][1])
+		finally:
+			self.close() # only has anything to do if something went wrong
+		return self.results
+	
+	# drops anything still waiting, for when the import has gone wrong partway through (so nothing gets left behind in shared memory)
+	def close(self):
+		for job in self.pending:
+			if job["future"]:
+				job["future"].cancel()
+			if job["sharedBlock"]:
+				release_shared_block(job["sharedBlock"])
+				job["sharedBlock"] = None
+		self.pending.clear()
+		for result,savingBlock in self.unloaded: # the saves have to finish before their blocks can go
+			concurrent.futures.wait([future for imageName,filepath,future in result[1]])
+			if savingBlock:
+				release_shared_block(savingBlock)
+		self.unloaded.clear()
 
 def register():
 	pass
 
 def unregister():
-	pass
+	shutdown_texture_decode_pool()
+	shutdown_png_writer_pool()
+	shutdown_subfile_inflate_pool()
 
 #[...]
\ No newline at end of file